@@ -10,74 +10,162 @@ from flask_cors import CORS
 BASE_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(BASE_DIR))
 
-# Initialize Flask app with explicit paths
-app = Flask(__name__,
-            template_folder=os.path.join(BASE_DIR, 'backend', 'templates'),
-            static_folder=os.path.join(BASE_DIR, 'backend', 'static'))
-
-# Configuration
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', f'sqlite:///{BASE_DIR}/instance/mic_innovation.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_pre_ping': True,
-    'pool_recycle': 300,
-}
-
 backend_path = Path(__file__).parent / "backend"
 sys.path.insert(0, str(backend_path))
 # Import db from models
 from models import db, Event, Resource, Contact, Newsletter, ChatSession, ChatMessage
+from backend.config import config
+from backend.engine_profiles import engine_options, init_engine_profile
+from db_routing import configure_read_replica, init_read_replica
+
+migrate = Migrate()
+
+
+def create_tables(app):
+    """Create any missing tables"""
+    with app.app_context():
+        try:
+            db.create_all()
+            print("Database tables created successfully")
+        except Exception as e:
+            print(f"Error creating database tables: {e}")
+
+
+def create_app(config_name=None):
+    """
+    Application factory.
+
+    `config_name` picks a class from backend/config.py; it defaults to
+    FLASK_CONFIG, then FLASK_ENV, then 'production'.
+    """
+    config_name = config_name or os.environ.get('FLASK_CONFIG') or os.environ.get('FLASK_ENV', 'production')
+
+    # Initialize Flask app with explicit paths
+    app = Flask(__name__,
+                template_folder=os.path.join(BASE_DIR, 'backend', 'templates'),
+                static_folder=os.path.join(BASE_DIR, 'backend', 'static'))
 
-# Initialize extensions with app
-db.init_app(app)
-migrate = Migrate(app, db)
-CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # Configuration
+    app.config.from_object(config.get(config_name, config['default']))
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    configure_read_replica(app)
 
-# Create tables
-with app.app_context():
-    
-    # Create tables if they don't exist
+    # Initialize extensions with app
+    db.init_app(app)
+    # SQLite pragmas / PostgreSQL settings, installed before the first connection
+    init_engine_profile(app, db)
+    init_read_replica(app, db)
+    migrate.init_app(app, db)
+    CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+    # Schema is managed with `flask init-db` / `flask db upgrade`; only
+    # development and testing create missing tables on startup
+    if app.config.get('AUTO_CREATE_TABLES', False):
+        create_tables(app)
+
+    # Import and register blueprints
     try:
-        db.create_all()
-        print("Database tables created successfully")
+        from backend.routes import main_bp, api_bp, admin_bp
+
+        app.register_blueprint(main_bp)
+        app.register_blueprint(api_bp, url_prefix='/api')
+        app.register_blueprint(admin_bp, url_prefix='/admin')
+        print("Blueprints registered successfully")
+
+        from backend.commands import register_commands
+        register_commands(app)
     except Exception as e:
-        print(f"Error creating database tables: {e}")
-
-# Import and register blueprints
-try:
-    from backend.routes import main_bp, api_bp, admin_bp
-    
-    app.register_blueprint(main_bp)
-    app.register_blueprint(api_bp, url_prefix='/api')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    print("Blueprints registered successfully")
-except Exception as e:
-    print(f"Error registering blueprints: {e}")
-    raise
-
-# Error handlers
-@app.errorhandler(404)
-def not_found_error(error):
-    try:
-        return render_template('404.html'), 404
-    except:
-        return "404 - Page Not Found", 404
+        print(f"Error registering blueprints: {e}")
+        raise
+
+    # Hot chat session store with write-behind to chat_sessions
+    from backend.chat_sessions import init_session_store
+    init_session_store(app)
+
+    # Chat messages are inserted in batches behind the request
+    from backend.chat_log import init_chat_log
+    init_chat_log(app)
+
+    # Caps concurrent Groq calls per process
+    from backend.llm_admission import init_llm_admission
+    init_llm_admission(app)
+
+    # Metrics (request latency, DB pool and query counts, background work) at /metrics
+    from backend.instrumentation import init_metrics
+    init_metrics(app, db)
+
+    # Per-request SQL profiling (QUERY_PROFILER_ENABLED)
+    from backend.query_profiler import init_query_profiler
+    init_query_profiler(app, db)
+
+    # On-demand sampling CPU profiler (PROFILER_ENABLED)
+    from backend.profiler import init_profiler
+    init_profiler(app)
+
+    # Per-client quotas and chat load shedding; after metrics so rejected requests are still counted
+    from backend.rate_limit import init_rate_limits
+    init_rate_limits(app)
+
+    # Error handlers
+    @app.errorhandler(404)
+    def not_found_error(error):
+        try:
+            return render_template('404.html'), 404
+        except:
+            return "404 - Page Not Found", 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        db.session.rollback()
+        try:
+            return render_template('500.html'), 500
+        except:
+            return "500 - Internal Server Error", 500
+
+    # Health check endpoints (/health/live and /health/ready probe dependencies)
+    from backend.health import init_health
+    init_health(app, db)
+
+    @app.route('/health')
+    def health_check():
+        return {'status': 'healthy', 'message': 'Application is running'}, 200
+
+    # gzip/brotli for HTML, JSON and streamed exports
+    from backend.compression import init_compression
+    init_compression(app)
+
+    # <picture> srcsets for images with generated derivatives
+    from backend.images import init_images
+    init_images(app)
+
+    # Fingerprinted static URLs; WhiteNoise wraps the app, so static requests skip Flask entirely
+    from backend.assets import init_assets
+    init_assets(app)
+
+    return app
+
+
+def init_worker(app):
+    """
+    Give a forked worker its own connections.
+
+    With gunicorn --preload the app (and its pooled DB connections and API
+    clients) is built in the master; sockets shared across processes corrupt
+    each other, so every worker drops them and opens fresh ones.
+    """
+    with app.app_context():
+        # close=False leaves the parent's sockets alone; this worker opens its own.
+        # Every bind, so the read replica's pool is not shared either
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    from backend.routes import reset_clients
+    reset_clients()
 
-@app.errorhandler(500)
-def internal_error(error):
-    db.session.rollback()
-    try:
-        return render_template('500.html'), 500
-    except:
-        return "500 - Internal Server Error", 500
 
-# Health check endpoint
-@app.route('/health')
-def health_check():
-    return {'status': 'healthy', 'message': 'Application is running'}, 200
+app = create_app()
 
 if __name__ == '__main__':
+    create_tables(app)
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
 application = app
@@ -1,4 +1,3 @@
-from groq import Groq
 import datetime
 from dotenv import dotenv_values
 import time
@@ -6,8 +5,12 @@ import os
 import sys
 import sqlite3
 import json
-from flask import current_app, request
+from flask import current_app, request, has_request_context
 from models import Event, Resource, Contact, Newsletter, ChatSession, ChatMessage, db
+from backend.metrics import REGISTRY, NOOP_TIMER, metrics_enabled
+from backend.chat_sessions import get_session_store, resolve_session_id, merge_context
+from backend.chat_log import log_message
+from backend.llm_admission import LLMOverCapacity, get_llm_admission
 import uuid
 import hashlib
 
@@ -15,16 +18,38 @@ env_vars = dotenv_values("../../.env")
 
 Username = env_vars.get("Username", "User")
 Assistantname = env_vars.get("Assistantname", "MAHE Innovation Centre Assistant")
-GroqAPIKey = env_vars.get("GroqAPIKey")
+GroqAPIKey = env_vars.get("GroqAPIKey") or os.environ.get("GroqAPIKey") or os.environ.get("GROQ_API_KEY")
 DB_PATH = os.path.join("instance", "mic_innovation.db")
 
-client = None
-if GroqAPIKey and GroqAPIKey != "your-groq-api-key-here":
+def create_client():
+    """Build the Groq client, or None when no API key is configured"""
+    if not GroqAPIKey or GroqAPIKey == "your-groq-api-key-here":
+        return None
     try:
-        client = Groq(api_key=GroqAPIKey)
+        # Imported here: the SDK takes a noticeable share of app startup
+        from groq import Groq
+        return Groq(api_key=GroqAPIKey)
     except Exception as e:
         print(f"Failed to initialize Groq client: {e}")
-        client = None
+        return None
+
+# Built on first use by get_client(); tests and benchmarks may assign a fake
+client = None
+_client_initialised = False
+
+def get_client():
+    """Return the Groq client, building it on first use"""
+    global client, _client_initialised
+    if client is None and not _client_initialised:
+        client = create_client()
+        _client_initialised = True
+    return client
+
+def reset_client():
+    """Forget the current client so the next call builds a fresh one"""
+    global client, _client_initialised
+    client = None
+    _client_initialised = False
 
 System = f"""You are {Assistantname}, the official AI assistant for MAHE Innovation Centre (MiC).
 
@@ -70,51 +95,36 @@ SystemChatBot = [
     {"role": "system", "content": System}
 ]
 
-def get_or_create_session():
-    """Get or create a chat session"""
+CHAT_STAGE_SECONDS = REGISTRY.histogram(
+    'chatbot_stage_seconds', 'Time spent in each stage of ChatBot()', ['stage']
+)
+CHAT_REQUEST_SECONDS = REGISTRY.histogram(
+    'chatbot_request_seconds', 'End-to-end ChatBot() latency'
+)
+
+def trace_stage(stage):
+    """Time one ChatBot() stage; returns a shared no-op when metrics are disabled"""
+    if not metrics_enabled():
+        return NOOP_TIMER
+    return CHAT_STAGE_SECONDS.time(stage=stage)
+
+def get_or_create_session(session_id=None):
+    """Get or create a chat session, served from the session store when it is hot"""
     try:
-        session_id = request.headers.get('X-Session-ID')
-        if not session_id:
-            session_id = str(uuid.uuid4())
-        
-        session = ChatSession.query.filter_by(session_id=session_id).first()
-        if not session:
-            session = ChatSession(
-                session_id=session_id,
-                user_ip=request.remote_addr,
-                user_agent=request.headers.get('User-Agent'),
-                context_data=json.dumps({
-                    'current_topic': None,
-                    'last_question_type': None,
-                    'mentioned_events': [],
-                    'mentioned_resources': [],
-                    'user_interests': []
-                })
-            )
-            db.session.add(session)
-            db.session.commit()
-        else:
-            session.last_activity = datetime.datetime.now()
-            db.session.commit()
-        
-        return session
+        session_id = session_id or resolve_session_id()
+        user_ip = request.remote_addr if has_request_context() else None
+        user_agent = request.headers.get('User-Agent') if has_request_context() else None
+        return get_session_store().load(session_id, user_ip, user_agent)
     except Exception as e:
         print(f"Error managing session: {e}")
         return None
 
 def save_message(session_id, role, content, metadata=None, context_used=None):
-    """Save message with metadata and context"""
+    """Save message with metadata and context (written behind the request, see backend/chat_log.py)"""
     try:
         with current_app.app_context():
-            message = ChatMessage(
-                session_id=session_id,
-                role=role,
-                content=content,
-                message_metadata=json.dumps(metadata) if metadata else None,
-                context_used=context_used
-            )
-            db.session.add(message)
-            db.session.commit()
+            log_message(session_id, role, content, metadata, context_used)
+            get_session_store().append_turn(session_id, role, content)
     except Exception as e:
         print(f"Error saving message: {e}")
 
@@ -122,7 +132,13 @@ def get_chat_history(session_id, limit=10):
     """Retrieve recent chat history for a session"""
     try:
         with current_app.app_context():
-            messages = ChatMessage.query.filter_by(session_id=session_id)\
+            state = get_session_store().get(session_id)
+            if state is not None:
+                return list(state.history[-limit:])
+            
+            # From the primary: a replica may not have this session's latest turns yet
+            messages = ChatMessage.query.execution_options(use_primary=True)\
+                .filter_by(session_id=session_id)\
                 .order_by(ChatMessage.timestamp.desc())\
                 .limit(limit).all()
             
@@ -132,15 +148,12 @@ def get_chat_history(session_id, limit=10):
         return []
 
 def update_session_context(session_id, context_updates):
-    """Update session context with new information"""
+    """Update session context with new information (written to the database behind the store)"""
     try:
         with current_app.app_context():
-            session = ChatSession.query.filter_by(session_id=session_id).first()
-            if session:
-                current_context = json.loads(session.context_data or '{}')
-                current_context.update(context_updates)
-                session.context_data = json.dumps(current_context)
-                db.session.commit()
+            if get_session_store().update_context(session_id, context_updates):
+                return
+            merge_context([(session_id, context_updates)])
     except Exception as e:
         print(f"Error updating session context: {e}")
 
@@ -148,9 +161,15 @@ def get_session_context(session_id):
     """Get current session context"""
     try:
         with current_app.app_context():
-            session = ChatSession.query.filter_by(session_id=session_id).first()
+            state = get_session_store().get(session_id)
+            if state is not None:
+                # Copy so the turn can edit lists without touching the cached state
+                return {key: list(value) if isinstance(value, list) else value for key, value in state.context.items()}
+            
+            session = ChatSession.query.execution_options(use_primary=True)\
+                .filter_by(session_id=session_id).first()
             if session:
-                return json.loads(session.context_data or '{}')
+                return dict(session.context_data or {})
             return {}
     except Exception as e:
         print(f"Error getting session context: {e}")
@@ -546,139 +565,183 @@ def get_fallback_response(query):
 
 def ChatBot(query, session_id=None):
     """Main chatbot function with enhanced logging and context awareness"""
+    if not metrics_enabled():
+        return _chat_turn(query, session_id)
+    with CHAT_REQUEST_SECONDS.time():
+        return _chat_turn(query, session_id)
+
+def _fallback_turn(query, session_id, context_analysis, reason=None):
+    """Answer from get_fallback_response() instead of the LLM and log the turn"""
+    with trace_stage('fallback'):
+        response = get_fallback_response(query)
+    with trace_stage('format_answer'):
+        formatted_response = format_answer(response)
+    with trace_stage('persistence'):
+        save_message(session_id, "user", query, {"context_analysis": context_analysis})
+        save_message(session_id, "assistant", formatted_response,
+                     {"fallback": True, "reason": reason} if reason else {"fallback": True})
+    return formatted_response
+
+def _over_capacity_turn(query, session_id, context_analysis, admission):
+    """No LLM slot: fall back, or raise LLMOverCapacity for the route to answer 503"""
+    if admission.mode == 'reject':
+        raise LLMOverCapacity(admission.retry_after_seconds())
+    return _fallback_turn(query, session_id, context_analysis, reason="over_capacity")
+
+def _chat_turn(query, session_id=None):
     try:
         if not query or not query.strip():
             return "Please provide a valid question or message."
         
-        session = get_or_create_session()
-        if not session:
-            session_id = str(uuid.uuid4())
-        else:
-            session_id = session.session_id
-        
-        session_context = get_session_context(session_id)
+        with trace_stage('session_load'):
+            session = get_or_create_session(session_id)
+            if not session:
+                session_id = session_id or str(uuid.uuid4())
+            else:
+                session_id = session.session_id
+            
+            session_context = get_session_context(session_id)
         
-        context_analysis = analyze_query_context(query, session_context)
+        with trace_stage('context_analysis'):
+            context_analysis = analyze_query_context(query, session_context)
+            website_related = is_website_related(query)
         
-        if not is_website_related(query):
-            save_message(session_id, "user", query, {"context_analysis": context_analysis})
-            save_message(session_id, "assistant", "I'm here to help with questions about MAHE Innovation Centre. Please ask me about our events, resources, programs, or how to get involved with MiC.")
+        if not website_related:
+            with trace_stage('persistence'):
+                save_message(session_id, "user", query, {"context_analysis": context_analysis})
+                save_message(session_id, "assistant", "I'm here to help with questions about MAHE Innovation Centre. Please ask me about our events, resources, programs, or how to get involved with MiC.")
             return "I'm here to help with questions about MAHE Innovation Centre. Please ask me about our events, resources, programs, or how to get involved with MiC."
         
-        if not client:
-            response = get_fallback_response(query)
-            formatted_response = format_answer(response)
-            save_message(session_id, "user", query, {"context_analysis": context_analysis})
-            save_message(session_id, "assistant", formatted_response, {"fallback": True})
-            return formatted_response
-        
-        context_messages = get_chat_history(session_id, limit=10)
-        
-        messages_for_api = SystemChatBot.copy()
-        
-        messages_for_api.append({
-            "role": "system", 
-            "content": get_realtime_information()
-        })
-        
-        context_prompt = generate_context_aware_response(query, session_context, context_analysis)
-        if context_prompt:
-            messages_for_api.append({
-                "role": "system",
-                "content": context_prompt
-            })
-        
-        events = []
-        resources = []
-        contacts = []
-        context_used = []
+        if not get_client():
+            return _fallback_turn(query, session_id, context_analysis)
         
-        if is_asking_about_events(query) or context_analysis['topic'] == 'events':
-            events = get_events(limit=5)
-            context_used.append('events')
-        elif is_asking_about_resources(query) or context_analysis['topic'] == 'resources':
-            resources = get_resources(limit=5)
-            context_used.append('resources')
-        else:
-            events = get_events(limit=3)
-            resources = get_resources(limit=3)
-            contacts = get_contact_info()
-            context_used.extend(['events', 'resources', 'contacts'])
+        with trace_stage('history_load'):
+            context_messages = get_chat_history(session_id, limit=10)
         
-        if events or resources or contacts:
-            website_context = format_website_context(events, resources, contacts)
-            messages_for_api.append({
-                "role": "system",
-                "content": website_context
-            })
+        with trace_stage('grounding'):
+            events = []
+            resources = []
+            contacts = []
+            context_used = []
+            
+            if is_asking_about_events(query) or context_analysis['topic'] == 'events':
+                events = get_events(limit=5)
+                context_used.append('events')
+            elif is_asking_about_resources(query) or context_analysis['topic'] == 'resources':
+                resources = get_resources(limit=5)
+                context_used.append('resources')
+            else:
+                events = get_events(limit=3)
+                resources = get_resources(limit=3)
+                contacts = get_contact_info()
+                context_used.extend(['events', 'resources', 'contacts'])
         
-        relevant_links = generate_relevant_links(query)
-        if relevant_links:
-            links_context = "Relevant website pages for this query:\n" + "\n".join(relevant_links)
+        with trace_stage('prompt_assembly'):
+            messages_for_api = SystemChatBot.copy()
+            
             messages_for_api.append({
-                "role": "system",
-                "content": links_context
+                "role": "system", 
+                "content": get_realtime_information()
             })
+            
+            context_prompt = generate_context_aware_response(query, session_context, context_analysis)
+            if context_prompt:
+                messages_for_api.append({
+                    "role": "system",
+                    "content": context_prompt
+                })
+            
+            if events or resources or contacts:
+                website_context = format_website_context(events, resources, contacts)
+                messages_for_api.append({
+                    "role": "system",
+                    "content": website_context
+                })
+            
+            relevant_links = generate_relevant_links(query)
+            if relevant_links:
+                links_context = "Relevant website pages for this query:\n" + "\n".join(relevant_links)
+                messages_for_api.append({
+                    "role": "system",
+                    "content": links_context
+                })
+            
+            messages_for_api.extend(context_messages)
+            messages_for_api.append({"role": "user", "content": query})
         
-        messages_for_api.extend(context_messages)
-        messages_for_api.append({"role": "user", "content": query})
+        admission = get_llm_admission()
+        with trace_stage('llm_admission'):
+            admitted = admission.acquire()
+        if not admitted:
+            return _over_capacity_turn(query, session_id, context_analysis, admission)
         
         try:
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile", 
-                messages=messages_for_api,
-                max_tokens=512,
-                temperature=0.3,  
-                top_p=0.8,        
-                stream=True,
-                stop=None
-            )
-
-            answer = ""
-            for chunk in completion:
-                if chunk.choices[0].delta.content:
-                    answer += chunk.choices[0].delta.content
+            tracing = metrics_enabled()
+            llm_started = time.perf_counter()
+            # The slot is held only while Groq is streaming
+            try:
+                completion = client.chat.completions.create(
+                    model="llama-3.3-70b-versatile", 
+                    messages=messages_for_api,
+                    max_tokens=512,
+                    temperature=0.3,  
+                    top_p=0.8,        
+                    stream=True,
+                    stop=None
+                )
+
+                answer = ""
+                for chunk in completion:
+                    if chunk.choices[0].delta.content:
+                        if tracing and not answer:
+                            CHAT_STAGE_SECONDS.observe(time.perf_counter() - llm_started, stage='llm_ttft')
+                        answer += chunk.choices[0].delta.content
+            finally:
+                admission.release()
+            if tracing:
+                CHAT_STAGE_SECONDS.observe(time.perf_counter() - llm_started, stage='llm_total')
             
-            formatted_answer = format_answer(answer)
+            with trace_stage('format_answer'):
+                formatted_answer = format_answer(answer)
             
             if formatted_answer and formatted_answer != query and not formatted_answer.startswith("I didn't generate"):
-                save_message(session_id, "user", query, {
-                    "context_analysis": context_analysis,
-                    "session_context": session_context
-                })
-                save_message(session_id, "assistant", formatted_answer, {
-                    "context_used": context_used,
-                    "events_count": len(events),
-                    "resources_count": len(resources)
-                }, context_used)
+                with trace_stage('persistence'):
+                    # The session's context lives on its chat_sessions row; messages only reference it
+                    save_message(session_id, "user", query, {
+                        "context_analysis": context_analysis
+                    })
+                    save_message(session_id, "assistant", formatted_answer, {
+                        "events_count": len(events),
+                        "resources_count": len(resources)
+                    }, ','.join(context_used))
                 
-                context_updates = {
-                    'current_topic': context_analysis['topic'],
-                    'last_question_type': context_analysis['question_type']
-                }
+                    context_updates = {
+                        'current_topic': context_analysis['topic'],
+                        'last_question_type': context_analysis['question_type']
+                    }
                 
-                if events:
-                    mentioned_events = session_context.get('mentioned_events', [])
-                    for event in events[:3]: 
-                        if event['title'] not in mentioned_events:
-                            mentioned_events.append(event['title'])
-                    context_updates['mentioned_events'] = mentioned_events[-5:]  
+                    if events:
+                        mentioned_events = session_context.get('mentioned_events', [])
+                        for event in events[:3]: 
+                            if event['title'] not in mentioned_events:
+                                mentioned_events.append(event['title'])
+                        context_updates['mentioned_events'] = mentioned_events[-5:]  
                 
-                if resources:
-                    mentioned_resources = session_context.get('mentioned_resources', [])
-                    for resource in resources[:3]:  
-                        if resource['title'] not in mentioned_resources:
-                            mentioned_resources.append(resource['title'])
-                    context_updates['mentioned_resources'] = mentioned_resources[-5:]  
+                    if resources:
+                        mentioned_resources = session_context.get('mentioned_resources', [])
+                        for resource in resources[:3]:  
+                            if resource['title'] not in mentioned_resources:
+                                mentioned_resources.append(resource['title'])
+                        context_updates['mentioned_resources'] = mentioned_resources[-5:]  
                 
-                if context_analysis['keywords']:
-                    user_interests = session_context.get('user_interests', [])
-                    for keyword in context_analysis['keywords']:
-                        if keyword not in user_interests and len(keyword) > 3:
-                            user_interests.append(keyword)
-                    context_updates['user_interests'] = user_interests[-10:] 
+                    if context_analysis['keywords']:
+                        user_interests = session_context.get('user_interests', [])
+                        for keyword in context_analysis['keywords']:
+                            if keyword not in user_interests and len(keyword) > 3:
+                                user_interests.append(keyword)
+                        context_updates['user_interests'] = user_interests[-10:] 
                 
-                update_session_context(session_id, context_updates)
+                    update_session_context(session_id, context_updates)
                 
                 return formatted_answer
             else:
@@ -689,9 +752,10 @@ def ChatBot(query, session_id=None):
 
         except Exception as e:
             if "rate limit" in str(e).lower() or "429" in str(e):
-                print("Rate limit hit, waiting 30 seconds...")
-                time.sleep(30)
-                return ChatBot(query, session_id)
+                cooldown = current_app.config.get('LLM_RATE_LIMIT_COOLDOWN', 30)
+                print(f"Rate limit hit, pausing LLM calls for {cooldown} seconds")
+                admission.cool_down(cooldown)
+                return _over_capacity_turn(query, session_id, context_analysis, admission)
             elif "context length" in str(e).lower():
                 print("Context too long, clearing some history...")
                 with current_app.app_context():
@@ -699,10 +763,13 @@ def ChatBot(query, session_id=None):
                         .order_by(ChatMessage.timestamp.desc())\
                         .limit(5).delete()
                     db.session.commit()
-                return ChatBot(query, session_id)
+                    get_session_store().invalidate(session_id)
+                return _chat_turn(query, session_id)
             else:
                 raise e
 
+    except LLMOverCapacity:
+        raise
     except Exception as e:
         print(f"ChatBot Error: {e}")
         error_msg = f"I encountered an error: {str(e)}. Please try again."
@@ -74,6 +74,17 @@ class ProfessionalEmailSender:
         token_path = "token.json"
         credentials_path = "credentials.json"
 
+        # Local stand-in (load tests): no OAuth, requests go to the given endpoint
+        if os.getenv("GMAIL_API_ENDPOINT"):
+            from google.auth.credentials import AnonymousCredentials
+            self.gmail_service = build(
+                "gmail", "v1",
+                credentials=AnonymousCredentials(),
+                client_options={"api_endpoint": os.getenv("GMAIL_API_ENDPOINT")},
+            )
+            print(f"✅ Using Gmail API endpoint {os.getenv('GMAIL_API_ENDPOINT')}")
+            return
+
         # ✅ Step 1: Write credentials from Render env vars (if available)
         if os.getenv("GOOGLE_CREDENTIALS"):
             with open(credentials_path, "w") as f:
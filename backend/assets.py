@@ -0,0 +1,154 @@
+"""
+Static asset build and serving.
+
+`flask build-assets` copies backend/static into backend/static/build with a
+content hash in every filename (js/chatbot.js -> build/js/chatbot.<hash>.js),
+minifies JavaScript, writes .gz (and .br when Brotli is installed) next to
+each compressible file and records the mapping in build/manifest.json.
+
+At runtime url_for('static', filename=...) resolves through the manifest and
+WhiteNoise answers /static/ requests before they reach Flask: hashed files
+are sent with a far-future (ten-year) immutable Cache-Control, in the precompressed
+variant the client accepts. Files missing from the manifest (e.g. uploads
+added after the build) keep their plain URL and STATIC_MAX_AGE.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+BUILD_DIRNAME = 'build'
+MANIFEST_NAME = 'manifest.json'
+
+# Text formats worth precompressing; images and fonts are already compressed
+COMPRESSIBLE_SUFFIXES = {'.js', '.css', '.svg', '.json', '.txt', '.html', '.xml', '.map'}
+MIN_COMPRESS_BYTES = 256
+
+_FINGERPRINTED = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+def _minify_js(data):
+    try:
+        import rjsmin
+    except ImportError:
+        return data
+    return rjsmin.jsmin(data.decode('utf-8')).encode('utf-8')
+
+
+MINIFIERS = {
+    '.js': _minify_js,
+}
+
+
+def fingerprinted_name(relative_path, data):
+    """js/chatbot.js + contents -> js/chatbot.<12 hex digits>.js"""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    path = Path(relative_path)
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def _write_compressed(path, data, stats):
+    """Write .gz/.br siblings when they are actually smaller"""
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        Path(f"{path}.gz").write_bytes(compressed)
+        stats['gzip'] += 1
+    try:
+        import brotli
+    except ImportError:
+        return
+    compressed = brotli.compress(data, quality=11)
+    if len(compressed) < len(data):
+        Path(f"{path}.br").write_bytes(compressed)
+        stats['brotli'] += 1
+
+
+def build_assets(static_dir):
+    """
+    (Re)build static_dir/build and its manifest; returns a stats dict.
+
+    The previous build is replaced, so run this once per deploy before the
+    workers start.
+    """
+    static_dir = Path(static_dir)
+    build_dir = static_dir / BUILD_DIRNAME
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+
+    manifest = {}
+    stats = {'files': 0, 'bytes_in': 0, 'bytes_out': 0, 'gzip': 0, 'brotli': 0}
+    for source in sorted(static_dir.rglob('*')):
+        relative = source.relative_to(static_dir)
+        if not source.is_file() or relative.parts[0] == BUILD_DIRNAME or source.name.startswith('.'):
+            continue
+        data = source.read_bytes()
+        stats['bytes_in'] += len(data)
+        suffix = source.suffix.lower()
+        if suffix in MINIFIERS:
+            data = MINIFIERS[suffix](data)
+
+        target_name = fingerprinted_name(relative.as_posix(), data)
+        target = build_dir / target_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        stats['files'] += 1
+        stats['bytes_out'] += len(data)
+        if suffix in COMPRESSIBLE_SUFFIXES and len(data) >= MIN_COMPRESS_BYTES:
+            _write_compressed(target, data, stats)
+        manifest[relative.as_posix()] = f"{BUILD_DIRNAME}/{target_name}"
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+    partial = build_dir / f"{MANIFEST_NAME}.tmp"
+    partial.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(partial, build_dir / MANIFEST_NAME)
+    return stats
+
+
+def load_manifest(static_dir):
+    """Source path -> fingerprinted path, or {} when no build exists"""
+    try:
+        with open(Path(static_dir) / BUILD_DIRNAME / MANIFEST_NAME) as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"Ignoring unreadable static manifest: {e}")
+        return {}
+
+
+def is_fingerprinted(path, url):
+    """WhiteNoise immutable_file_test: hashed names never change content"""
+    return bool(_FINGERPRINTED.search(url))
+
+
+def init_assets(app):
+    """Resolve static URLs through the manifest and serve /static/ with WhiteNoise"""
+    manifest = load_manifest(app.static_folder) if app.config.get('STATIC_USE_MANIFEST', True) else {}
+    app.extensions['asset_manifest'] = manifest
+
+    if manifest:
+        @app.url_defaults
+        def fingerprint_static_urls(endpoint, values):
+            if endpoint == 'static' and values.get('filename') in manifest:
+                values['filename'] = manifest[values['filename']]
+
+    if not app.config.get('STATIC_WHITENOISE', True):
+        return manifest
+    try:
+        from whitenoise import WhiteNoise
+    except ImportError:
+        print("whitenoise is not installed; static files are served by Flask")
+        return manifest
+    app.wsgi_app = WhiteNoise(
+        app.wsgi_app,
+        root=app.static_folder,
+        prefix=app.static_url_path,
+        max_age=app.config.get('STATIC_MAX_AGE', 3600),
+        autorefresh=app.debug,
+        immutable_file_test=is_fingerprinted
+    )
+    print(f"Static files served by WhiteNoise ({len(manifest)} fingerprinted)")
+    return manifest
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark result files and flag regressions.
+
+    python backend/benchmarks/compare.py base.json head.json --threshold 10
+
+Exits with status 1 if any benchmark's median got slower by more than
+--threshold percent.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as results:
+        return json.load(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed median slowdown in percent")
+    parser.add_argument('--metric', default='median_ms', help="Result field to compare")
+    args = parser.parse_args()
+
+    base = load(args.base)
+    head = load(args.head)
+    for key in ('rows', 'database'):
+        if base['meta'].get(key) != head['meta'].get(key):
+            print(f"Warning: {key} differs ({base['meta'].get(key)} vs {head['meta'].get(key)})")
+
+    regressions = []
+    print(f"{'benchmark':24} {'base':>12} {'head':>12} {'change':>9}")
+    for name in sorted(set(base['results']) | set(head['results'])):
+        if name not in base['results'] or name not in head['results']:
+            print(f"{name:24} {'only in ' + ('head' if name in head['results'] else 'base'):>35}")
+            continue
+        before = base['results'][name][args.metric]
+        after = head['results'][name][args.metric]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:24} {before:>10.3f}ms {after:>10.3f}ms {change:>+8.1f}%{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+CPU cost versus bytes saved for response compression.
+
+Seeds a database, captures real uncompressed responses (public pages, JSON
+APIs, an admin listing and a CSV export) and times gzip and brotli at several
+levels on each, plus the cost of a compressed-body cache hit:
+
+    python backend/benchmarks/compression.py --rows 1k --repeat 20
+    python backend/benchmarks/compression.py --levels gzip:1,gzip:6,br:4 --output compression.json
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import statistics
+import tempfile
+import time
+
+from run_benchmarks import SCALES, load_app
+
+RESPONSES = {
+    'page_index': '/',
+    'page_events': '/events',
+    'page_resources': '/resources',
+    'api_events': '/api/events',
+    'api_resources': '/api/resources',
+    'admin_contacts': '/admin/contacts',
+    'export_contacts_csv': '/admin/export/contacts?format=csv',
+}
+
+DEFAULT_LEVELS = 'gzip:1,gzip:6,gzip:9,br:1,br:4,br:6,br:11'
+
+
+def compressor_for(spec):
+    encoding, level = spec.split(':')
+    level = int(level)
+    if encoding == 'gzip':
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == 'br':
+        try:
+            import brotli
+        except ImportError:
+            return None
+        return lambda data: brotli.compress(data, quality=level)
+    raise ValueError(f"Unknown encoding in {spec!r}")
+
+
+def median_ms(func, data, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1k', help="Rows per table: 1k, 100k, 1m or an integer")
+    parser.add_argument('--levels', default=DEFAULT_LEVELS, help="Comma-separated encoding:level pairs")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed compressions per response and level")
+    parser.add_argument('--output', default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+    rows = SCALES.get(args.rows.lower()) or int(args.rows)
+
+    app = load_app(f"sqlite:///{tempfile.mkdtemp(prefix='mic-compress-')}/bench.db")
+    from backend.benchmarks.seed import seed
+    with app.app_context():
+        seed(rows)
+
+    client = app.test_client()
+    bodies = {}
+    for name, path in RESPONSES.items():
+        response = client.get(path)
+        if response.status_code != 200:
+            print(f"Skipping {name}: {path} returned {response.status_code}")
+            continue
+        bodies[name] = response.get_data()
+
+    levels = [(spec, compressor_for(spec)) for spec in args.levels.split(',')]
+    levels = [(spec, func) for spec, func in levels if func is not None]
+
+    results = {}
+    header = f"{'response':22} {'bytes':>9}" + ''.join(f" {spec:>16}" for spec, _ in levels) + f" {'cache hit':>10}"
+    print(header)
+    print(' ' * 33 + ''.join(f" {'ratio   ms':>16}" for _ in levels))
+    for name, data in bodies.items():
+        row = {'bytes': len(data), 'levels': {}}
+        cells = []
+        for spec, func in levels:
+            compressed = func(data)
+            ms = median_ms(func, data, args.repeat)
+            row['levels'][spec] = {
+                'bytes': len(compressed),
+                'ratio': round(len(compressed) / len(data), 3),
+                'median_ms': round(ms, 3),
+                'mb_per_s': round(len(data) / 1e6 / (ms / 1000), 1) if ms else None,
+            }
+            cells.append(f" {len(compressed) / len(data):>7.1%} {ms:>7.2f}")
+        # What compress_cached() does on a hit: digest the body and look it up
+        hit_ms = median_ms(lambda body: hashlib.blake2b(body, digest_size=16).digest(), data, args.repeat)
+        row['cache_hit_ms'] = round(hit_ms, 4)
+        results[name] = row
+        print(f"{name:22} {len(data):>9}" + ''.join(cells) + f" {hit_ms:>9.3f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'rows': rows, 'repeat': args.repeat, 'results': results}, output, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
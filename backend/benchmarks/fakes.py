@@ -0,0 +1,61 @@
+"""
+In-process stand-ins for the Groq and Gmail clients used by the benchmarks
+"""
+import time
+
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, content):
+        self.delta = _Delta(content)
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.choices = [_Choice(content)]
+
+
+CANNED_ANSWER = (
+    "MAHE Innovation Centre hosts workshops, hackathons and demo days throughout the semester. "
+    "The Innovation Summit brings founders, investors and students together for a full day of talks. "
+    "Check our Events page at /events for dates and registration details. "
+    "You can also browse toolkits and guides on our Resources page at /resources."
+)
+
+
+class FakeGroqClient:
+    """
+    Mimics client.chat.completions.create(stream=True).
+
+    `ttft` and `chunk_delay` are in seconds; both default to 0 so the
+    benchmark measures only our own code unless latency is asked for.
+    """
+
+    def __init__(self, answer=CANNED_ANSWER, chunk_size=24, ttft=0.0, chunk_delay=0.0):
+        self.answer = answer
+        self.chunk_size = chunk_size
+        self.ttft = ttft
+        self.chunk_delay = chunk_delay
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs):
+        if self.ttft:
+            time.sleep(self.ttft)
+        return self._stream()
+
+    def _stream(self):
+        for start in range(0, len(self.answer), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield _Chunk(self.answer[start:start + self.chunk_size])
+
+
+def disable_gmail_auth():
+    """Stop ProfessionalEmailSender from running the OAuth flow when app.py is imported"""
+    from backend.MailIntegration import ProfessionalEmailSender
+    ProfessionalEmailSender._authenticate_gmail = lambda self: None
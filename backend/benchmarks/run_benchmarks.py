@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for the API, admin pages, chatbot pipeline and mail builder.
+
+Seeds a database at the requested scale, times each benchmark and writes
+JSON results that can be compared across commits with compare.py:
+
+    python backend/benchmarks/run_benchmarks.py --rows 100000 --output bench-100k.json
+    python backend/benchmarks/compare.py base.json bench-100k.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1k', help="Rows per table: 1k, 100k, 1m or an integer")
+    parser.add_argument('--content-rows', type=int, default=None, help="Events/resources rows (default rows // 100)")
+    parser.add_argument('--database-url', default=None, help="Database to seed (default: a temporary SQLite file)")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed iterations per benchmark")
+    parser.add_argument('--warmup', type=int, default=2, help="Untimed iterations per benchmark")
+    parser.add_argument('--only', default=None, help="Comma-separated benchmark names to run")
+    parser.add_argument('--skip-seed', action='store_true', help="Reuse data already in --database-url")
+    parser.add_argument('--output', default=None, help="Write JSON results to this file")
+    return parser.parse_args()
+
+
+def load_app(database_url):
+    """Import app.py against the benchmark database with external clients stubbed"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('METRICS_ENABLED', 'False')
+    for path in (str(ROOT_DIR), str(BACKEND_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    from backend.benchmarks.fakes import disable_gmail_auth
+    disable_gmail_auth()
+
+    from app import app
+    return app
+
+
+def time_call(func, repeat, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    p95_index = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+    return {
+        'iterations': len(samples),
+        'min_ms': round(samples[0] * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'p95_ms': round(samples[p95_index] * 1000, 3),
+        'max_ms': round(samples[-1] * 1000, 3),
+    }
+
+
+def build_benchmarks(app):
+    """Return {name: zero-argument callable}"""
+    import backend.Chatbot as chatbot
+    from backend.Chatbot import ChatBot, format_answer
+    from backend.MailIntegration import ProfessionalEmailSender
+    from backend.benchmarks.fakes import FakeGroqClient, CANNED_ANSWER
+
+    client = app.test_client()
+
+    def get(path):
+        def run():
+            response = client.get(path)
+            response.get_data()
+            assert response.status_code == 200, f"{path} returned {response.status_code}"
+        return run
+
+    chatbot.client = FakeGroqClient()
+
+    def chatbot_turn():
+        with app.test_request_context('/api/chatbot', method='POST', headers={'X-Session-ID': 'bench-session-0'}):
+            ChatBot("What workshops and events are coming up?", 'bench-session-0')
+
+    raw_answer = "**Upcoming events:** " + CANNED_ANSWER + "</s>"
+
+    mail_sender = ProfessionalEmailSender(groq_api_key=None)
+    mail_body = "Hello,\n\nThanks for subscribing to the MIC Innovation Centre newsletter.\n\nBest regards,\nMIC"
+
+    return {
+        'api_events': get('/api/events'),
+        'api_resources': get('/api/resources'),
+        'page_events': get('/events'),
+        'page_resources': get('/resources'),
+        'admin_events': get('/admin/events'),
+        'admin_contacts': get('/admin/contacts'),
+        'admin_contacts_search': get('/admin/contacts?q=visitor42'),
+        'admin_newsletter': get('/admin/newsletter'),
+        'chatbot_turn': chatbot_turn,
+        'format_answer': lambda: format_answer(raw_answer),
+        'mail_create_message': lambda: mail_sender.create_message('subscriber@example.com', 'Welcome', mail_body),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    rows = SCALES.get(args.rows.lower()) or int(args.rows)
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.mkdtemp(prefix='mic-bench-')
+        database_url = f"sqlite:///{temp_dir}/bench.db"
+
+    app = load_app(database_url)
+    from models import db
+    from backend.benchmarks.seed import seed
+
+    with app.app_context():
+        seeded = None
+        if not args.skip_seed:
+            started = time.perf_counter()
+            seeded = seed(rows, args.content_rows)
+            print(f"Seeded {seeded} in {time.perf_counter() - started:.1f}s")
+        dialect = db.engine.dialect.name
+
+    benchmarks = build_benchmarks(app)
+    if args.only:
+        wanted = set(args.only.split(','))
+        benchmarks = {name: func for name, func in benchmarks.items() if name in wanted}
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = time_call(func, args.repeat, args.warmup)
+        print(f"{name:24} median {results[name]['median_ms']:>10.3f}ms  p95 {results[name]['p95_ms']:>10.3f}ms")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'rows': rows,
+            'seeded': seeded,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
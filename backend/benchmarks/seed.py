@@ -0,0 +1,104 @@
+"""
+Bulk seeding of benchmark data at a chosen scale
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from models import Event, Resource, Contact, Newsletter, ChatSession, ChatMessage, db
+
+CHUNK_SIZE = 5000
+
+# Chat sessions each get this many messages
+MESSAGES_PER_SESSION = 10
+
+
+def _insert_chunked(model, make_row, count):
+    for start in range(0, count, CHUNK_SIZE):
+        rows = [make_row(index) for index in range(start, min(start + CHUNK_SIZE, count))]
+        db.session.execute(insert(model), rows)
+    db.session.commit()
+
+
+def seed(rows, content_rows=None):
+    """
+    Reset the schema and seed it.
+
+    Contacts, newsletter subscribers and chat messages get `rows` rows each;
+    events and resources get `content_rows` (default rows // 100, at least 10),
+    since the public pages list them in full.
+    """
+    content_rows = content_rows or max(10, rows // 100)
+    base = datetime(2025, 1, 1)
+
+    db.drop_all()
+    db.create_all()
+
+    _insert_chunked(Event, lambda i: {
+        'title': f"Benchmark Event {i}",
+        'description': "Hands-on workshop on prototyping, validation and pitching. " * 3,
+        'date': base + timedelta(hours=i),
+        'location': f"Innovation Hub Room {i % 20}",
+        'attendees': i % 300,
+        'price': 'Free',
+        'image_url': None,
+        'status': 'upcoming' if i % 3 else 'completed',
+        'created_at': base + timedelta(minutes=i),
+    }, content_rows)
+
+    _insert_chunked(Resource, lambda i: {
+        'title': f"Benchmark Resource {i}",
+        'description': "Guide covering business model canvas and funding strategies. " * 3,
+        'category': ('toolkit', 'guide', 'mentorship', 'workshop')[i % 4],
+        'file_url': f"https://example.com/resource-{i}.pdf",
+        'download_count': i % 500,
+        'rating': 4.0 + (i % 10) / 10,
+        'format': 'PDF',
+        'duration': '2 Hours Read',
+        'is_featured': i % 10 == 0,
+        'created_at': base + timedelta(minutes=i),
+    }, content_rows)
+
+    _insert_chunked(Contact, lambda i: {
+        'name': f"Visitor {i}",
+        'email': f"visitor{i}@example.com",
+        'subject': 'general',
+        'message': "I'd like to know more about the incubation programme and mentorship. " * 2,
+        'phone': None,
+        'company': f"Startup {i % 1000}",
+        'created_at': base + timedelta(seconds=i),
+    }, rows)
+
+    _insert_chunked(Newsletter, lambda i: {
+        'email': f"subscriber{i}@example.com",
+        'is_active': i % 7 != 0,
+        'subscribed_at': base + timedelta(seconds=i),
+    }, rows)
+
+    sessions = max(1, rows // MESSAGES_PER_SESSION)
+    _insert_chunked(ChatSession, lambda i: {
+        'session_id': f"bench-session-{i}",
+        'user_ip': '127.0.0.1',
+        'user_agent': 'benchmark',
+        'context_data': {'current_topic': 'events', 'mentioned_events': [], 'mentioned_resources': [], 'user_interests': []},
+        'created_at': base + timedelta(minutes=i),
+        'last_activity': base + timedelta(minutes=i),
+    }, sessions)
+
+    _insert_chunked(ChatMessage, lambda i: {
+        'session_id': f"bench-session-{i // MESSAGES_PER_SESSION}",
+        'role': 'user' if i % 2 == 0 else 'assistant',
+        'content': "What events are coming up this month?" if i % 2 == 0 else "Check our Events page at /events.",
+        'timestamp': base + timedelta(seconds=i),
+        'message_metadata': None,
+        'context_used': None,
+    }, sessions * MESSAGES_PER_SESSION)
+
+    return {
+        'events': content_rows,
+        'resources': content_rows,
+        'contacts': rows,
+        'newsletter': rows,
+        'chat_sessions': sessions,
+        'chat_messages': sessions * MESSAGES_PER_SESSION,
+    }
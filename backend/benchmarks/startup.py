@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long `import app` takes, and what it pulls in.
+
+Runs `python -X importtime -c "import app"` in fresh interpreters and
+fails when the median wall time exceeds --budget-ms or when any of the
+deferred SDKs (Groq, Google API client, OAuth flow) is imported at startup:
+
+    python backend/benchmarks/startup.py --budget-ms 1500 --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT_DIR / 'backend'
+
+# Modules that must only load on first use, never while importing the app
+DEFERRED_MODULES = ('groq', 'googleapiclient', 'google_auth_oauthlib')
+
+IMPORT_SNIPPET = (
+    "import sys, time; "
+    "sys.path[:0] = [{root!r}, {backend!r}]; "
+    "started = time.perf_counter(); "
+    "import app; "
+    "print('WALL_MS', (time.perf_counter() - started) * 1000)"
+)
+
+
+def parse_importtime(stderr):
+    """Return [(module, self_us, cumulative_us)] from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_once(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, METRICS_ENABLED='False')
+    snippet = IMPORT_SNIPPET.format(root=str(ROOT_DIR), backend=str(BACKEND_DIR))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', snippet],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import app failed:\n{completed.stderr[-2000:]}")
+    wall_ms = next(
+        float(line.split()[1]) for line in completed.stdout.splitlines() if line.startswith('WALL_MS')
+    )
+    return wall_ms, parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help="Maximum median wall time of `import app`")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports (by cumulative time) to list")
+    parser.add_argument('--database-url', default=None, help="Database for the app (default: a temporary SQLite file)")
+    parser.add_argument('--output', default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='mic-startup-')}/startup.db"
+
+    walls = []
+    modules = []
+    for _ in range(args.repeat):
+        wall_ms, modules = measure_once(database_url)
+        walls.append(wall_ms)
+
+    median_ms = statistics.median(walls)
+    imported = {name for name, _, _ in modules}
+    leaked = sorted(name for name in DEFERRED_MODULES if name in imported)
+
+    by_cumulative = sorted(modules, key=lambda module: module[2], reverse=True)
+    print(f"import app: median {median_ms:.1f}ms, min {min(walls):.1f}ms over {len(walls)} run(s) "
+          f"(budget {args.budget_ms:.0f}ms), {len(modules)} modules")
+    print(f"{'module':48} {'cumulative':>12}")
+    for name, _, cumulative_us in by_cumulative[:args.top]:
+        print(f"{name:48} {cumulative_us / 1000:>10.1f}ms")
+
+    report = {
+        'median_ms': round(median_ms, 2),
+        'min_ms': round(min(walls), 2),
+        'runs_ms': [round(wall, 2) for wall in walls],
+        'budget_ms': args.budget_ms,
+        'module_count': len(modules),
+        'deferred_imported': leaked,
+        'slowest': [{'module': name, 'cumulative_ms': round(cumulative_us / 1000, 2)}
+                    for name, _, cumulative_us in by_cumulative[:args.top]],
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"Results written to {args.output}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.1f}ms exceeds the {args.budget_ms:.0f}ms budget")
+    if leaked:
+        failures.append(f"deferred modules imported at startup: {', '.join(leaked)}")
+    if failures:
+        print('\nFAIL: ' + '; '.join(failures))
+        sys.exit(1)
+    print('\nOK')
+
+
+if __name__ == '__main__':
+    main()
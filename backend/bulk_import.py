@@ -0,0 +1,165 @@
+"""
+Bulk import of events and resources from JSON arrays or NDJSON
+"""
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from models import Event, Resource, db
+
+# Field name -> (type, required)
+EVENT_FIELDS = {
+    'title': (str, True),
+    'description': (str, True),
+    'date': (datetime, True),
+    'location': (str, True),
+    'attendees': (int, False),
+    'price': (str, False),
+    'image_url': (str, False),
+    'status': (str, False),
+}
+
+RESOURCE_FIELDS = {
+    'title': (str, True),
+    'description': (str, False),
+    'category': (str, False),
+    'file_url': (str, False),
+    'download_count': (int, False),
+    'rating': (float, False),
+    'format': (str, False),
+    'duration': (str, False),
+    'is_featured': (bool, False),
+}
+
+IMPORTS = {
+    'events': (Event, EVENT_FIELDS),
+    'resources': (Resource, RESOURCE_FIELDS),
+}
+
+
+class ImportResult:
+    """Outcome of a bulk import: inserted rows and per-row errors"""
+
+    def __init__(self, inserted=0, errors=None, ids=None):
+        self.inserted = inserted
+        self.errors = errors or []
+        self.ids = ids or []
+
+    def to_dict(self):
+        return {
+            'inserted': self.inserted,
+            'failed': len(self.errors),
+            'errors': self.errors,
+        }
+
+
+def parse_records(text):
+    """Parse a JSON array, a single JSON object or NDJSON into a list of records"""
+    text = text.strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        return json.loads(text)
+    try:
+        record = json.loads(text)
+        return [record]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _coerce(value, field_type):
+    if field_type is datetime:
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(value)
+    if field_type is bool:
+        if isinstance(value, str):
+            return value.strip().lower() in ('1', 'true', 'yes')
+        return bool(value)
+    if field_type is str:
+        return str(value)
+    return field_type(value)
+
+
+def validate_record(record, model, fields):
+    """Return (row, None) for a valid record or (None, error message)"""
+    if not isinstance(record, dict):
+        return None, 'Record must be a JSON object'
+
+    row = {}
+    for name, (field_type, required) in fields.items():
+        value = record.get(name)
+        if value is None or value == '':
+            if required:
+                return None, f"Missing required field: {name}"
+            continue
+        try:
+            value = _coerce(value, field_type)
+        except (TypeError, ValueError):
+            return None, f"Invalid value for {name}: {record.get(name)!r}"
+
+        max_length = getattr(model.__table__.c[name].type, 'length', None)
+        if max_length and isinstance(value, str) and len(value) > max_length:
+            return None, f"{name} exceeds {max_length} characters"
+        row[name] = value
+
+    unknown = set(record) - set(fields)
+    if unknown:
+        return None, f"Unknown fields: {', '.join(sorted(unknown))}"
+    return row, None
+
+
+def validate_records(records, model, fields):
+    """Validate a batch; returns (valid rows, per-row errors)"""
+    rows = []
+    errors = []
+    for index, record in enumerate(records):
+        row, error = validate_record(record, model, fields)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            rows.append(row)
+    return rows, errors
+
+
+def _fill_defaults(rows, model):
+    """Give every row the same keys so the insert runs as one executemany batch"""
+    now = datetime.utcnow()
+    columns = [column for column in model.__table__.columns if not column.primary_key]
+    filled = []
+    for row in rows:
+        full = {}
+        for column in columns:
+            if column.name in row:
+                full[column.name] = row[column.name]
+            elif column.default is not None and column.default.is_scalar:
+                full[column.name] = column.default.arg
+            elif column.default is not None:
+                full[column.name] = now
+            else:
+                full[column.name] = None
+        filled.append(full)
+    return filled
+
+
+def bulk_import(name, records, all_or_nothing=False):
+    """
+    Validate and insert records for the `events` or `resources` import.
+
+    Valid rows are inserted in a single executemany statement and a single
+    commit. Invalid rows are skipped and reported by index, unless
+    all_or_nothing is set, in which case nothing is inserted.
+    """
+    model, fields = IMPORTS[name]
+    rows, errors = validate_records(records, model, fields)
+
+    if not rows or (errors and all_or_nothing):
+        return ImportResult(0, errors)
+
+    rows = _fill_defaults(rows, model)
+    result = db.session.execute(insert(model).returning(model.id), rows)
+    ids = [row_id for (row_id,) in result]
+    db.session.commit()
+
+    return ImportResult(len(rows), errors, ids)
@@ -0,0 +1,194 @@
+"""
+Write-behind logging of chat messages.
+
+ChatBot() hands each message to a ChatLogWriter and returns without waiting
+for the database. A background thread inserts queued messages in batches of
+up to CHAT_LOG_BATCH_SIZE, at most CHAT_LOG_FLUSH_INTERVAL seconds after
+the first one arrived, and the queue is flushed at shutdown.
+
+The queue holds at most CHAT_LOG_QUEUE_SIZE messages. When it is full a
+request waits up to CHAT_LOG_BLOCK_MS for room and then writes its message
+itself, so overload slows chat down rather than dropping history. A crash
+loses at most the queued messages, about one flush interval's worth.
+"""
+import atexit
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+
+from backend.metrics import REGISTRY
+from models import ChatMessage, db
+
+CHAT_LOG_MESSAGES = REGISTRY.counter(
+    'chat_log_messages_total', 'Chat messages logged, by how they were written', ['outcome']
+)
+CHAT_LOG_BATCH_SECONDS = REGISTRY.histogram(
+    'chat_log_batch_seconds', 'Time to insert one batch of chat messages'
+)
+
+
+def message_row(session_id, role, content, metadata=None, context_used=None):
+    """chat_messages row for one message, timestamped now so batching keeps turn order"""
+    return {
+        'session_id': session_id,
+        'role': role,
+        'content': content,
+        'timestamp': datetime.utcnow(),
+        'message_metadata': json.dumps(metadata) if metadata else None,
+        'context_used': context_used,
+    }
+
+
+def insert_messages(rows):
+    """
+    Insert rows in one statement; if that fails (e.g. a session was deleted
+    by retention meanwhile), insert them one by one and skip the bad ones.
+    Returns the number written. Needs an app context.
+    """
+    try:
+        db.session.execute(insert(ChatMessage.__table__), rows)
+        db.session.commit()
+        return len(rows)
+    except Exception as e:
+        db.session.rollback()
+        if len(rows) == 1:
+            print(f"Error saving chat message: {e}")
+            return 0
+        print(f"Chat log batch of {len(rows)} failed, retrying row by row: {e}")
+    written = 0
+    for row in rows:
+        try:
+            db.session.execute(insert(ChatMessage.__table__), [row])
+            db.session.commit()
+            written += 1
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving chat message: {e}")
+    return written
+
+
+class ChatLogWriter:
+    """Bounded queue of chat_messages rows drained by a batching thread"""
+
+    def __init__(self, app, batch_size=200, flush_interval=0.5, max_queue=5000, block_timeout=0.25):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # Started lazily so a preloaded app does not fork with a live thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='chat-log-writer', daemon=True)
+                    self._thread.start()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def submit(self, row):
+        """Queue a row; when the queue stays full past block_timeout, write it in the caller"""
+        self._ensure_worker()
+        try:
+            self._queue.put(row, timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            pass
+        with self.app.app_context():
+            written = insert_messages([row])
+        CHAT_LOG_MESSAGES.inc(written, outcome='inline')
+        CHAT_LOG_MESSAGES.inc(1 - written, outcome='failed')
+        return False
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                written = insert_messages(batch)
+        except Exception as e:
+            print(f"Chat log write failed: {e}")
+            written = 0
+        CHAT_LOG_BATCH_SECONDS.observe(time.perf_counter() - started)
+        CHAT_LOG_MESSAGES.inc(written, outcome='batched')
+        CHAT_LOG_MESSAGES.inc(len(batch) - written, outcome='failed')
+        for _ in batch:
+            self._queue.task_done()
+
+    def _run(self):
+        while True:
+            self._write(self._collect())
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far is written; returns False on timeout"""
+        if self._thread is None or not self._thread.is_alive():
+            # No writer (never started, or lost across a fork): drain here
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                print(f"Chat log flush timed out with {self._queue.unfinished_tasks} message(s) pending")
+                return False
+            time.sleep(0.01)
+        return True
+
+
+def init_chat_log(app):
+    """Create the app's chat log writer from CHAT_LOG_* settings (None when disabled)"""
+    if not app.config.get('CHAT_LOG_ASYNC', True):
+        app.extensions['chat_log'] = None
+        return None
+    writer = ChatLogWriter(
+        app,
+        batch_size=app.config.get('CHAT_LOG_BATCH_SIZE', 200),
+        flush_interval=app.config.get('CHAT_LOG_FLUSH_INTERVAL', 0.5),
+        max_queue=app.config.get('CHAT_LOG_QUEUE_SIZE', 5000),
+        block_timeout=app.config.get('CHAT_LOG_BLOCK_MS', 250) / 1000.0
+    )
+    app.extensions['chat_log'] = writer
+    atexit.register(writer.flush)
+
+    from backend.instrumentation import watch_queue
+    watch_queue('chat_log', writer.qsize)
+    return writer
+
+
+def log_message(session_id, role, content, metadata=None, context_used=None):
+    """Record a chat message: queued when write-behind is enabled, otherwise inserted now"""
+    row = message_row(session_id, role, content, metadata, context_used)
+    writer = current_app.extensions.get('chat_log')
+    if writer is not None:
+        writer.submit(row)
+        return
+    written = insert_messages([row])
+    CHAT_LOG_MESSAGES.inc(written, outcome='inline')
+    CHAT_LOG_MESSAGES.inc(1 - written, outcome='failed')
@@ -0,0 +1,167 @@
+"""
+Chat data retention: archive idle chat sessions to gzipped NDJSON and delete them
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from backend.engine_profiles import no_statement_timeout
+from models import ChatSession, ChatMessage, db
+
+
+class RetentionReport:
+    """Counters collected while a retention run archives and deletes sessions"""
+
+    def __init__(self, cutoff, archive_path=None, dry_run=False):
+        self.cutoff = cutoff
+        self.archive_path = archive_path
+        self.dry_run = dry_run
+        self.sessions = 0
+        self.messages = 0
+        self.row_bytes = 0
+        self.archive_bytes = 0
+        self.database_bytes_reclaimed = None
+
+    def to_dict(self):
+        return {
+            'cutoff': self.cutoff.isoformat(),
+            'dry_run': self.dry_run,
+            'archive_path': self.archive_path,
+            'sessions_archived': self.sessions,
+            'messages_archived': self.messages,
+            'row_bytes_removed': self.row_bytes,
+            'archive_bytes': self.archive_bytes,
+            'database_bytes_reclaimed': self.database_bytes_reclaimed,
+        }
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _session_record(session, messages):
+    return {
+        'session_id': session.session_id,
+        'user_ip': session.user_ip,
+        'user_agent': session.user_agent,
+        'context_data': session.context_data,
+        'created_at': _isoformat(session.created_at),
+        'last_activity': _isoformat(session.last_activity),
+        'messages': [
+            {
+                'role': message.role,
+                'content': message.content,
+                'timestamp': _isoformat(message.timestamp),
+                'message_metadata': message.message_metadata,
+                'context_used': message.context_used,
+            }
+            for message in messages
+        ],
+    }
+
+
+def _idle_batches(cutoff, batch_size):
+    """Yield batches of idle sessions, walking forward by primary key"""
+    last_id = 0
+    while True:
+        batch = ChatSession.query\
+            .filter(ChatSession.last_activity < cutoff, ChatSession.id > last_id)\
+            .order_by(ChatSession.id.asc())\
+            .limit(batch_size).all()
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield batch
+
+
+def archive_idle_sessions(days, archive_dir, batch_size=500, dry_run=False):
+    """
+    Archive sessions idle for more than `days` days and delete them.
+
+    Each batch is written to the archive, flushed, then deleted and committed
+    in its own short transaction, so the tables are never locked for the
+    whole run and an interrupted run loses nothing that was not archived.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    archive_path = None
+    if not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(archive_dir, f"chat-archive-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.ndjson.gz")
+    report = RetentionReport(cutoff, archive_path, dry_run)
+
+    archive = gzip.open(archive_path, 'wt', encoding='utf-8') if archive_path else None
+    try:
+        for batch in _idle_batches(cutoff, batch_size):
+            session_ids = [session.session_id for session in batch]
+            messages_by_session = {session_id: [] for session_id in session_ids}
+            messages = ChatMessage.query\
+                .filter(ChatMessage.session_id.in_(session_ids))\
+                .order_by(ChatMessage.id.asc()).all()
+            for message in messages:
+                messages_by_session[message.session_id].append(message)
+
+            for session in batch:
+                line = json.dumps(_session_record(session, messages_by_session[session.session_id]))
+                report.row_bytes += len(line.encode('utf-8'))
+                if archive:
+                    archive.write(line + '\n')
+            report.sessions += len(batch)
+            report.messages += len(messages)
+
+            if dry_run:
+                db.session.rollback()
+                continue
+
+            archive.flush()
+            with no_statement_timeout(db.session.connection()):
+                ChatMessage.query.filter(ChatMessage.session_id.in_(session_ids)).delete(synchronize_session=False)
+                ChatSession.query.filter(ChatSession.session_id.in_(session_ids)).delete(synchronize_session=False)
+            db.session.commit()
+            db.session.expunge_all()
+    finally:
+        if archive:
+            archive.close()
+
+    if archive_path:
+        if report.sessions:
+            report.archive_bytes = os.path.getsize(archive_path)
+        else:
+            os.remove(archive_path)
+            report.archive_path = None
+    return report
+
+
+def _sqlite_file_size(engine):
+    path = engine.url.database
+    if path and path != ':memory:' and os.path.exists(path):
+        return os.path.getsize(path)
+    return None
+
+
+def compact_chat_tables():
+    """
+    Return freed pages to the operating system after a large delete.
+
+    SQLite needs a VACUUM to shrink the file; on PostgreSQL a plain VACUUM
+    makes the space reusable and refreshes planner statistics. Returns the
+    number of bytes the SQLite file shrank by, or None when unknown.
+    """
+    engine = db.engine
+    db.session.remove()
+    if engine.dialect.name == 'sqlite':
+        before = _sqlite_file_size(engine)
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text('VACUUM'))
+            # Under WAL the rewritten pages land in the -wal file; fold them back so the main file shrinks
+            connection.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+        after = _sqlite_file_size(engine)
+        return before - after if before is not None and after is not None else None
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            with no_statement_timeout(connection):
+                connection.execute(text('VACUUM (ANALYZE) chat_messages'))
+                connection.execute(text('VACUUM (ANALYZE) chat_sessions'))
+    return None
@@ -0,0 +1,375 @@
+"""
+Chat session resolution and a hot session store.
+
+The store keeps each session's context and recent turns so a steady-state
+chat turn reads neither `chat_sessions` nor `chat_messages`. Changed context
+keys and activity are merged into `chat_sessions` by a background thread
+every SESSION_FLUSH_INTERVAL seconds (and at exit); new sessions are
+inserted immediately so their messages always have a parent row.
+
+By default the store is an in-process LRU. With several workers a session's
+turns can land on different processes, where a private LRU would serve stale
+history and write stale context back, so without SESSION_STORE_URL pointing
+at a shared Redis instance a multi-worker deployment caches nothing and every
+turn reads the database.
+"""
+import atexit
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import Text, bindparam, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from models import ChatMessage, ChatSession, db
+
+SESSION_COOKIE_NAME = 'chat_session_id'
+SESSION_HEADER_NAME = 'X-Session-ID'
+
+_SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.\-]{1,100}$')
+
+
+def default_context():
+    return {
+        'current_topic': None,
+        'last_question_type': None,
+        'mentioned_events': [],
+        'mentioned_resources': [],
+        'user_interests': []
+    }
+
+
+def resolve_session_id(explicit=None):
+    """
+    Pick the session id for this request: an explicit value (the JSON body),
+    then the X-Session-ID header, then the session cookie. Malformed ids are
+    ignored; a new id is minted when none is usable.
+    """
+    candidates = [explicit]
+    if has_request_context():
+        candidates += [request.headers.get(SESSION_HEADER_NAME), request.cookies.get(SESSION_COOKIE_NAME)]
+    for candidate in candidates:
+        if isinstance(candidate, str) and _SESSION_ID_PATTERN.match(candidate.strip()):
+            return candidate.strip()
+    return str(uuid.uuid4())
+
+
+class SessionState:
+    """Context and recent turns of one chat session"""
+
+    def __init__(self, session_id, context=None, history=None):
+        self.session_id = session_id
+        self.context = context if context is not None else default_context()
+        self.history = history or []
+
+    def to_json(self):
+        return json.dumps({'context': self.context, 'history': self.history})
+
+    @classmethod
+    def from_json(cls, session_id, payload):
+        data = json.loads(payload)
+        return cls(session_id, data.get('context'), data.get('history'))
+
+
+class LocalSessionBackend:
+    """In-process LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries=1000, ttl=1800):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            state, expires = entry
+            if time.monotonic() >= expires:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+            return state
+
+    def set(self, state):
+        with self._lock:
+            self._entries[state.session_id] = (state, time.monotonic() + self.ttl)
+            self._entries.move_to_end(state.session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class NullSessionBackend:
+    """Caches nothing: every lookup misses, so callers read and write the database"""
+
+    def get(self, session_id):
+        return None
+
+    def set(self, state):
+        pass
+
+    def delete(self, session_id):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class RedisSessionBackend:
+    """
+    Shared store for multi-process deployments.
+
+    `client` is anything with redis-py's get/set(ex=)/delete, so tests and
+    load runs can pass a local stand-in instead of a real server.
+    """
+
+    def __init__(self, client, ttl=1800, prefix='mic:chat-session:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, ttl=1800):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('SESSION_STORE_URL is set but the redis package is not installed')
+        return cls(redis.Redis.from_url(url), ttl)
+
+    def get(self, session_id):
+        payload = self.client.get(self.prefix + session_id)
+        if payload is None:
+            return None
+        return SessionState.from_json(session_id, payload)
+
+    def set(self, state):
+        self.client.set(self.prefix + state.session_id, state.to_json(), ex=self.ttl)
+
+    def delete(self, session_id):
+        self.client.delete(self.prefix + session_id)
+
+
+class SessionStore:
+    """Loads sessions through the backend and writes context changes behind"""
+
+    def __init__(self, app, backend, history_limit=10, flush_interval=5.0):
+        self.app = app
+        self.backend = backend
+        self.history_limit = history_limit
+        self.flush_interval = flush_interval
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self):
+        # Started lazily so a preloaded app does not fork with a live thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='session-writer', daemon=True)
+                    self._thread.start()
+
+    def pending(self):
+        return len(self._dirty)
+
+    def load(self, session_id, user_ip=None, user_agent=None):
+        """Return the session's state, reading or creating the database row only on a store miss"""
+        state = self.backend.get(session_id)
+        if state is not None:
+            self._mark_dirty(session_id, None)
+            return state
+
+        # From the primary: a lagging replica would make us insert a duplicate row
+        row = ChatSession.query.execution_options(use_primary=True)\
+            .filter_by(session_id=session_id).first()
+        if row is None:
+            row = ChatSession(
+                session_id=session_id,
+                user_ip=user_ip,
+                user_agent=user_agent,
+                context_data=default_context()
+            )
+            db.session.add(row)
+            db.session.commit()
+            state = SessionState(session_id)
+        else:
+            messages = ChatMessage.query.execution_options(use_primary=True)\
+                .filter_by(session_id=session_id)\
+                .order_by(ChatMessage.timestamp.desc())\
+                .limit(self.history_limit).all()
+            state = SessionState(
+                session_id,
+                dict(row.context_data or {}),
+                [{"role": msg.role, "content": msg.content} for msg in reversed(messages)]
+            )
+            self._mark_dirty(session_id, None)
+        self.backend.set(state)
+        return state
+
+    def get(self, session_id):
+        """Cached state, or None if the session is not in the store"""
+        return self.backend.get(session_id)
+
+    def append_turn(self, session_id, role, content):
+        state = self.backend.get(session_id)
+        if state is None:
+            return
+        state.history.append({"role": role, "content": content})
+        del state.history[:-self.history_limit]
+        self.backend.set(state)
+
+    def update_context(self, session_id, context_updates):
+        state = self.backend.get(session_id)
+        if state is None:
+            return False
+        state.context.update(context_updates)
+        self.backend.set(state)
+        self._mark_dirty(session_id, dict(context_updates))
+        return True
+
+    def invalidate(self, session_id):
+        self.backend.delete(session_id)
+
+    def _mark_dirty(self, session_id, patch):
+        """Queue a write-behind of changed context keys; patch None only bumps last_activity"""
+        with self._dirty_lock:
+            self._queue_patch(session_id, patch, datetime.utcnow())
+        self._ensure_writer()
+
+    def _queue_patch(self, session_id, patch, seen):
+        previous = self._dirty.get(session_id)
+        if previous is not None and previous[0]:
+            # Keys queued earlier still need writing; newer values win
+            patch = {**previous[0], **(patch or {})}
+        self._dirty[session_id] = (patch or None, seen)
+
+    def flush(self):
+        """Write pending context and activity changes; returns the number of sessions written"""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+        try:
+            with self.app.app_context():
+                merge_context(
+                    [(session_id, patch) for session_id, (patch, seen) in dirty.items() if patch],
+                    {session_id: seen for session_id, (patch, seen) in dirty.items()}
+                )
+        except Exception as e:
+            print(f"Session write-behind failed: {e}")
+            # Requeue underneath anything newer that arrived meanwhile
+            with self._dirty_lock:
+                newer, self._dirty = self._dirty, {}
+                for session_id, (patch, seen) in dirty.items():
+                    self._queue_patch(session_id, patch, seen)
+                for session_id, (patch, seen) in newer.items():
+                    self._queue_patch(session_id, patch, seen)
+            return 0
+        return len(dirty)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+def context_merge_expression(dialect_name):
+    """
+    SQL merging the JSON object in :patch into context_data without reading
+    it first, or None when the dialect has no JSON merge.
+    """
+    column = ChatSession.__table__.c.context_data
+    patch = bindparam('patch', type_=Text)
+    if dialect_name == 'postgresql':
+        return func.coalesce(column, cast(literal('{}', Text), JSONB)).op('||')(cast(patch, JSONB))
+    if dialect_name == 'sqlite':
+        # RFC 7396 merge: a null value removes the key, which reads back as None anyway
+        return func.json_patch(func.coalesce(column, literal('{}', Text)), patch)
+    return None
+
+
+def merge_context(patches, seen=None):
+    """
+    Merge context changes into chat_sessions in one transaction.
+
+    `patches` is [(session_id, {key: value})]; `seen` optionally maps
+    session ids to a new last_activity.
+    """
+    table = ChatSession.__table__
+    seen = seen or {}
+    expression = context_merge_expression(db.engine.dialect.name)
+    if patches and expression is not None:
+        db.session.execute(
+            update(table)
+            .where(table.c.session_id == bindparam('sid'))
+            .values(context_data=expression, last_activity=bindparam('seen')),
+            [
+                {'sid': session_id, 'patch': json.dumps(patch), 'seen': seen.get(session_id, datetime.utcnow())}
+                for session_id, patch in patches
+            ]
+        )
+    elif patches:
+        # No server-side merge: read-modify-write each session
+        for session_id, patch in patches:
+            row = ChatSession.query.filter_by(session_id=session_id).first()
+            if row is not None:
+                row.context_data = {**(row.context_data or {}), **patch}
+                row.last_activity = seen.get(session_id, datetime.utcnow())
+
+    patched = {session_id for session_id, _ in patches}
+    activity_only = [
+        {'sid': session_id, 'seen': when} for session_id, when in seen.items() if session_id not in patched
+    ]
+    if activity_only:
+        db.session.execute(
+            update(table)
+            .where(table.c.session_id == bindparam('sid'))
+            .values(last_activity=bindparam('seen')),
+            activity_only
+        )
+    db.session.commit()
+
+
+def init_session_store(app):
+    """Create the app's session store from SESSION_* settings"""
+    ttl = app.config.get('SESSION_CACHE_TTL', 1800)
+    url = app.config.get('SESSION_STORE_URL')
+    workers = app.config.get('WEB_CONCURRENCY', 1)
+    if url:
+        backend = RedisSessionBackend.from_url(url, ttl)
+    elif workers > 1:
+        print(f"SESSION_STORE_URL is not set and {workers} workers are running: "
+              f"chat sessions are not cached, every turn reads the database")
+        backend = NullSessionBackend()
+    else:
+        backend = LocalSessionBackend(app.config.get('SESSION_CACHE_SIZE', 1000), ttl)
+    store = SessionStore(
+        app,
+        backend,
+        history_limit=app.config.get('SESSION_HISTORY_LIMIT', 10),
+        flush_interval=app.config.get('SESSION_FLUSH_INTERVAL', 5.0)
+    )
+    app.extensions['chat_session_store'] = store
+    atexit.register(store.flush)
+
+    from backend.instrumentation import watch_queue
+    watch_queue('session_writes', store.pending)
+    return store
+
+
+def get_session_store():
+    return current_app.extensions['chat_session_store']
@@ -0,0 +1,95 @@
+"""
+Flask CLI commands (run with `flask --app app <command>`)
+"""
+import json
+import os
+
+import click
+
+from backend.assets import build_assets
+from backend.bulk_import import IMPORTS, bulk_import, parse_records
+from backend.chat_retention import archive_idle_sessions, compact_chat_tables
+from backend.images import IMAGE_SUFFIXES, process_images, static_image_path
+
+
+def register_commands(app):
+    """Attach the CLI commands to the app"""
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create missing tables and upgrade existing ones (run on deploy, before starting the server)."""
+        from models import db
+        from backend.schema import upgrade_schema
+        db.create_all()
+        click.echo("Database tables created successfully")
+        for name in upgrade_schema(db.engine):
+            click.echo(f"Applied schema upgrade: {name}")
+
+    @app.cli.command('build-assets')
+    def build_static_assets():
+        """Fingerprint, minify and precompress backend/static into backend/static/build (run at build time)."""
+        stats = build_assets(app.static_folder)
+        click.echo(json.dumps(stats, indent=2))
+
+    @app.cli.command('build-images')
+    @click.option('--force', is_flag=True, help='Regenerate derivatives that are already up to date.')
+    def build_images(force):
+        """Write resized WebP/AVIF derivatives of uploads and local event images (run before build-assets)."""
+        from models import Event
+        uploads = os.path.join(app.static_folder, 'uploads')
+        paths = set()
+        for root, _, files in os.walk(uploads):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in IMAGE_SUFFIXES:
+                    paths.add(os.path.relpath(os.path.join(root, name), app.static_folder).replace(os.sep, '/'))
+        try:
+            image_urls = [url for (url,) in Event.query.with_entities(Event.image_url).filter(Event.image_url.isnot(None))]
+        except Exception as e:
+            # Builds can run before the database exists; new events are processed when created
+            click.echo(f"Skipping event images: {e.__class__.__name__}")
+            image_urls = []
+        for image_url in image_urls:
+            path = static_image_path(image_url)
+            if path and os.path.isfile(os.path.join(app.static_folder, path)):
+                paths.add(path)
+        stats = process_images(app, sorted(paths), force=force)
+        click.echo(json.dumps(stats, indent=2))
+        if stats['failed']:
+            raise SystemExit(1)
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(sorted(IMPORTS)))
+    @click.argument('source', type=click.File('r', encoding='utf-8'))
+    @click.option('--atomic', is_flag=True, help='Insert nothing if any record is invalid.')
+    @click.option('--announce', is_flag=True, help='Email imported events to newsletter subscribers.')
+    def import_data(kind, source, atomic, announce):
+        """Bulk import events or resources from a JSON array or NDJSON file ('-' for stdin)."""
+        try:
+            records = parse_records(source.read())
+        except ValueError as e:
+            raise click.ClickException(f"Invalid JSON/NDJSON input: {e}")
+
+        result = bulk_import(kind, records, all_or_nothing=atomic)
+        click.echo(json.dumps(result.to_dict(), indent=2))
+
+        if kind == 'events' and announce and result.ids:
+            from backend.routes import announce_events_async
+            announce_events_async(app, result.ids)
+
+        if result.errors:
+            raise SystemExit(1)
+
+    @app.cli.command('chat-retention')
+    @click.option('--days', default=lambda: app.config.get('CHAT_RETENTION_DAYS', 90), type=int,
+                  show_default='CHAT_RETENTION_DAYS or 90', help='Archive sessions idle for more than this many days.')
+    @click.option('--archive-dir', default=None, help='Directory for the gzipped NDJSON archives.')
+    @click.option('--batch-size', default=500, show_default=True, help='Sessions archived and deleted per transaction.')
+    @click.option('--vacuum', is_flag=True, help='Compact the chat tables after deleting.')
+    @click.option('--dry-run', is_flag=True, help='Report what would be archived without writing or deleting.')
+    def chat_retention(days, archive_dir, batch_size, vacuum, dry_run):
+        """Archive idle chat sessions and their messages, then delete them."""
+        archive_dir = archive_dir or app.config.get('CHAT_ARCHIVE_DIR') or os.path.join(app.instance_path, 'chat_archive')
+        report = archive_idle_sessions(days, archive_dir, batch_size=batch_size, dry_run=dry_run)
+        if vacuum and not dry_run:
+            report.database_bytes_reclaimed = compact_chat_tables()
+        click.echo(json.dumps(report.to_dict(), indent=2))
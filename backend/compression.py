@@ -0,0 +1,176 @@
+"""
+Response compression for HTML, JSON and the other text responses.
+
+Clients that send Accept-Encoding get brotli (when the Brotli package is
+installed) or gzip for text responses of at least COMPRESS_MIN_SIZE bytes.
+Compressed bodies are kept in a small LRU keyed by a digest of the original,
+so pages and API responses that come out identical on every request are
+compressed once. Streamed responses (admin listings, exports) are compressed
+chunk by chunk and flushed every COMPRESS_STREAM_FLUSH_BYTES, so the first
+rows still arrive early.
+
+Static files never get here: WhiteNoise serves them, precompressed, before
+the request reaches Flask.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/xml', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'application/x-ndjson',
+}
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, available):
+    """Best encoding from `available` (in preference order) the client accepts, or None"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class Compressor:
+    """Compresses bodies and streams with the configured levels"""
+
+    def __init__(self, gzip_level=6, brotli_quality=4, cache_size=256, cache_max_bytes=1024 * 1024):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.encodings = (['br'] if _brotli() else []) + ['gzip']
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return _brotli().compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_cached(self, data, encoding):
+        """compress(), reusing the result for a body seen recently"""
+        if self.cache_size <= 0 or len(data) > self.cache_max_bytes:
+            return self.compress(data, encoding)
+        key = (hashlib.blake2b(data, digest_size=16).digest(), encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        compressed = self.compress(data, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def compress_stream(self, chunks, encoding, flush_bytes=16384):
+        """Compress an iterable of chunks, flushing whenever flush_bytes of input are pending"""
+        if encoding == 'br':
+            stream = _brotli().Compressor(quality=self.brotli_quality)
+            feed, flush, finish = stream.process, stream.flush, stream.finish
+        else:
+            stream = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            feed, finish = stream.compress, stream.flush
+            flush = lambda: stream.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+        pending = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                output = feed(chunk)
+                pending += len(chunk)
+                if pending >= flush_bytes:
+                    output += flush()
+                    pending = 0
+                if output:
+                    yield output
+            yield finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+
+def _compressible(response, min_size):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return False
+    if 'no-transform' in (response.headers.get('Cache-Control') or ''):
+        return False
+    if response.is_streamed:
+        return True
+    return (response.content_length or 0) >= min_size
+
+
+def init_compression(app):
+    """Compress eligible responses after each request (COMPRESS_ENABLED)"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return None
+    compressor = Compressor(
+        gzip_level=app.config.get('COMPRESS_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESS_BR_QUALITY', 4),
+        cache_size=app.config.get('COMPRESS_CACHE_SIZE', 256)
+    )
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    flush_bytes = app.config.get('COMPRESS_STREAM_FLUSH_BYTES', 16384)
+    app.extensions['compression'] = compressor
+
+    @app.after_request
+    def compress_response(response):
+        if request.method == 'HEAD' or not _compressible(response, min_size):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'), compressor.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compressor.compress_stream(response.response, encoding, flush_bytes)
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compressor.compress_cached(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak)
+        return response
+
+    return compressor
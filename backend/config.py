@@ -7,6 +7,45 @@ class Config:
     """Base configuration class"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Engine profile (see backend/engine_profiles.py); create_app() builds
+    # SQLALCHEMY_ENGINE_OPTIONS from these. gunicorn.conf.py sizes the pool
+    # to the worker's thread count.
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE', 'auto')
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+
+    # Optional read replica (see backend/db_routing.py); clients read from the
+    # primary for DB_REPLICA_STICKY_SECONDS after they write
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+    # Static files (see backend/assets.py): URLs resolve through the manifest written by
+    # `flask build-assets`; files outside it are cached for STATIC_MAX_AGE seconds
+    STATIC_USE_MANIFEST = os.environ.get('STATIC_USE_MANIFEST', 'True').lower() == 'true'
+    STATIC_WHITENOISE = os.environ.get('STATIC_WHITENOISE', 'True').lower() == 'true'
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 3600))
+    # Response compression (see backend/compression.py): gzip/brotli for text responses
+    # of at least COMPRESS_MIN_SIZE bytes; streamed responses flush every
+    # COMPRESS_STREAM_FLUSH_BYTES of input
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', 4))
+    COMPRESS_CACHE_SIZE = int(os.environ.get('COMPRESS_CACHE_SIZE', 256))
+    COMPRESS_STREAM_FLUSH_BYTES = int(os.environ.get('COMPRESS_STREAM_FLUSH_BYTES', 16384))
+    
+    # Image derivatives (see backend/images.py and `flask build-images`)
+    IMAGE_WIDTHS = [int(width) for width in os.environ.get('IMAGE_WIDTHS', '64,128,320,640,960,1280,1920').split(',')]
+    IMAGE_FORMATS = os.environ.get('IMAGE_FORMATS', 'avif,webp').split(',')
+    IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 75))
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'static/uploads')
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     
@@ -28,22 +67,123 @@ class Config:
     # Application configuration
     APP_NAME = os.environ.get('APP_NAME', 'MIC Innovation')
     APP_VERSION = os.environ.get('APP_VERSION', '1.0.0')
+    
+    # Create missing tables on startup instead of via `flask init-db`
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'False').lower() == 'true'
+    
+    # Admin listing configuration
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', 50))
+    ADMIN_MAX_PAGE_SIZE = int(os.environ.get('ADMIN_MAX_PAGE_SIZE', 1000))
+    ADMIN_STREAM_THRESHOLD = int(os.environ.get('ADMIN_STREAM_THRESHOLD', 200))
+    
+    # Newsletter ingest configuration (a window of 0 disables micro-batching)
+    NEWSLETTER_BATCH_WINDOW_MS = int(os.environ.get('NEWSLETTER_BATCH_WINDOW_MS', 0))
+    NEWSLETTER_BATCH_MAX_SIZE = int(os.environ.get('NEWSLETTER_BATCH_MAX_SIZE', 500))
+    
+    # Chat retention (see `flask chat-retention`)
+    CHAT_RETENTION_DAYS = int(os.environ.get('CHAT_RETENTION_DAYS', 90))
+    CHAT_ARCHIVE_DIR = os.environ.get('CHAT_ARCHIVE_DIR')
+    
+    # Chat session store: in-process LRU unless SESSION_STORE_URL points at Redis. The LRU
+    # is only used with a single worker (WEB_CONCURRENCY, exported by gunicorn.conf.py);
+    # several workers without Redis cache nothing
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+    SESSION_STORE_URL = os.environ.get('SESSION_STORE_URL')
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 1000))
+    SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL', 1800))
+    SESSION_HISTORY_LIMIT = int(os.environ.get('SESSION_HISTORY_LIMIT', 10))
+    SESSION_FLUSH_INTERVAL = float(os.environ.get('SESSION_FLUSH_INTERVAL', 5))
+    
+    # Chat message write-behind (see backend/chat_log.py): batches are written at most
+    # CHAT_LOG_FLUSH_INTERVAL seconds after a message is queued; a full queue makes
+    # requests wait CHAT_LOG_BLOCK_MS, then write their own message
+    CHAT_LOG_ASYNC = os.environ.get('CHAT_LOG_ASYNC', 'True').lower() == 'true'
+    CHAT_LOG_BATCH_SIZE = int(os.environ.get('CHAT_LOG_BATCH_SIZE', 200))
+    CHAT_LOG_FLUSH_INTERVAL = float(os.environ.get('CHAT_LOG_FLUSH_INTERVAL', 0.5))
+    CHAT_LOG_QUEUE_SIZE = int(os.environ.get('CHAT_LOG_QUEUE_SIZE', 5000))
+    CHAT_LOG_BLOCK_MS = int(os.environ.get('CHAT_LOG_BLOCK_MS', 250))
+    
+    # Rate limits (see backend/rate_limit.py): comma-separated quotas per client IP, plus
+    # per chat session for the chatbot; an empty value disables that quota. Counters are
+    # per process unless RATELIMIT_STORAGE_URL points at Redis. RATELIMIT_TRUSTED_PROXIES
+    # is the number of proxies in front of the app whose X-Forwarded-For can be believed
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() == 'true'
+    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL')
+    RATELIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 0))
+    RATELIMIT_CHATBOT = os.environ.get('RATELIMIT_CHATBOT', '20/minute,300/day')
+    RATELIMIT_CHATBOT_SESSION = os.environ.get('RATELIMIT_CHATBOT_SESSION', '10/minute')
+    RATELIMIT_CONTACT = os.environ.get('RATELIMIT_CONTACT', '5/minute,30/day')
+    RATELIMIT_NEWSLETTER = os.environ.get('RATELIMIT_NEWSLETTER', '5/minute,50/day')
+    RATELIMIT_EVENTS = os.environ.get('RATELIMIT_EVENTS', '10/minute,200/day')
+    RATELIMIT_RESOURCES = os.environ.get('RATELIMIT_RESOURCES', '10/minute,200/day')
+    # Chat requests one process handles at once before answering 503; by default two of
+    # the worker's threads stay free for pages and other API calls
+    RATELIMIT_CHAT_MAX_INFLIGHT = int(os.environ.get(
+        'RATELIMIT_CHAT_MAX_INFLIGHT', max(1, int(os.environ.get('GUNICORN_THREADS', 8)) - 2)
+    ))
+    RATELIMIT_SHED_RETRY_AFTER = int(os.environ.get('RATELIMIT_SHED_RETRY_AFTER', 5))
+    
+    # LLM admission control (see backend/llm_admission.py): concurrent Groq calls per process,
+    # how many turns may wait and for how long, and what a turned-away turn gets
+    # ('fallback' answers from get_fallback_response, 'reject' returns 503). By default
+    # the queue holds every chat request the shedder admits beyond the running calls
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 4))
+    LLM_MAX_QUEUE = int(os.environ.get(
+        'LLM_MAX_QUEUE', max(0, RATELIMIT_CHAT_MAX_INFLIGHT - LLM_MAX_CONCURRENCY)
+    ))
+    LLM_QUEUE_TIMEOUT_MS = int(os.environ.get('LLM_QUEUE_TIMEOUT_MS', 2000))
+    LLM_OVERLOAD_MODE = os.environ.get('LLM_OVERLOAD_MODE', 'fallback')
+    LLM_RETRY_AFTER = int(os.environ.get('LLM_RETRY_AFTER', 5))
+    LLM_RATE_LIMIT_COOLDOWN = int(os.environ.get('LLM_RATE_LIMIT_COOLDOWN', 30))
+    
+    # Metrics collection (latency histograms exposed in Prometheus format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Readiness probes: seconds to cache each dependency check, and which checks must pass
+    HEALTH_CHECK_TTL = float(os.environ.get('HEALTH_CHECK_TTL', 10))
+    HEALTH_REQUIRED_CHECKS = os.environ.get('HEALTH_REQUIRED_CHECKS', 'database').split(',')
+    
+    # SQL query profiler: per-request query counts, N+1 and budget warnings
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False').lower() == 'true'
+    QUERY_PROFILER_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILER_SAMPLE_RATE', 1.0))
+    QUERY_PROFILER_VERBOSE = os.environ.get('QUERY_PROFILER_VERBOSE', 'False').lower() == 'true'
+    QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', 20))
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 5))
+    
+    # Sampling CPU profiler at /admin/profile (off unless explicitly enabled; needs PROFILER_TOKEN)
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'False').lower() == 'true'
+    PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN')
+    PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR')
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///mic_innovation.db'
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'True').lower() == 'true'
+    # Edited JS shows up on reload instead of a stale build
+    STATIC_USE_MANIFEST = os.environ.get('STATIC_USE_MANIFEST', 'False').lower() == 'true'
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 0))
+    QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'True').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     # For Render deployment, use PostgreSQL
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or os.environ.get('RENDER_DATABASE_URL') or 'sqlite:///mic_innovation.db'
+    # When enabled in production, profile only a sample of requests
+    QUERY_PROFILER_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILER_SAMPLE_RATE', 0.01))
+    # Render and Heroku put one proxy in front of the app
+    RATELIMIT_TRUSTED_PROXIES = int(os.environ.get('RATELIMIT_TRUSTED_PROXIES', 1))
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    DATABASE_REPLICA_URL = None
+    # Tests read chat_messages right after a turn
+    CHAT_LOG_ASYNC = False
+    RATELIMIT_ENABLED = False
+    AUTO_CREATE_TABLES = True
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,123 @@
+"""
+Read-replica routing for db.session.
+
+When SQLALCHEMY_BINDS has a 'replica' entry (DATABASE_REPLICA_URL adds one),
+plain SELECTs issued while handling a GET/HEAD/OPTIONS request go to the
+replica. Writes, locking reads, queries with
+`.execution_options(use_primary=True)`, other HTTP methods (unless the view
+is decorated with @replica_reads) and anything outside a request (CLI
+commands, background threads) use the primary.
+
+Reads stay on the primary once the request has written, and the response
+sets a short-lived cookie so the same client keeps reading from the primary
+for DB_REPLICA_STICKY_SECONDS while the replica catches up.
+"""
+import time
+
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE_NAME = 'db_primary_until'
+USE_PRIMARY = 'use_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Kept on the WSGI environ rather than flask.g: ChatBot() pushes nested app
+# contexts, each with its own g, but they all share the request
+_WROTE_KEY = 'mic.db_wrote'
+_PRIMARY_KEY = 'mic.db_read_primary'
+
+
+def replica_reads(view):
+    """Let a non-GET view read from the replica (its read-then-write lookups must use USE_PRIMARY)"""
+    view.replica_reads = True
+    return view
+
+
+class RoutingSession(Session):
+    """Session that sends request-time reads to the replica bind when one is configured"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None or self._flushing:
+            return False
+        if clause.get_execution_options().get(USE_PRIMARY) or not has_request_context():
+            return False
+        if request.environ.get(_WROTE_KEY) or request.environ.get(_PRIMARY_KEY):
+            return False
+        return REPLICA_BIND in self._db.engines
+
+
+def _mark_written():
+    if has_request_context():
+        request.environ[_WROTE_KEY] = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_written()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _after_execute(orm_execute_state):
+    # Bulk update()/delete() and raw SQL bypass the flush
+    if not orm_execute_state.is_select:
+        _mark_written()
+
+
+def replica_bind(config):
+    """SQLALCHEMY_BINDS entry for DATABASE_REPLICA_URL, using the primary's engine profile"""
+    from backend.engine_profiles import engine_options
+
+    url = config['DATABASE_REPLICA_URL']
+    return {'url': url, **engine_options({**config, 'SQLALCHEMY_DATABASE_URI': url})}
+
+
+def configure_read_replica(app):
+    """Add the replica bind from DATABASE_REPLICA_URL (call before db.init_app)"""
+    if app.config.get('DATABASE_REPLICA_URL'):
+        app.config.setdefault('SQLALCHEMY_BINDS', {}).setdefault(REPLICA_BIND, replica_bind(app.config))
+
+
+def init_read_replica(app, db):
+    """Register the stickiness hooks when a replica bind exists"""
+    if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+        return False
+    sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', 5)
+
+    @app.before_request
+    def choose_read_bind():
+        if request.method not in SAFE_METHODS:
+            view = current_app.view_functions.get(request.endpoint)
+            if not getattr(view, 'replica_reads', False):
+                request.environ[_PRIMARY_KEY] = True
+                return
+        try:
+            until = float(request.cookies.get(STICKY_COOKIE_NAME, 0))
+        except ValueError:
+            until = 0
+        if until > time.time():
+            request.environ[_PRIMARY_KEY] = True
+
+    @app.after_request
+    def remember_write(response):
+        if request.environ.get(_WROTE_KEY) and sticky_seconds > 0:
+            response.set_cookie(
+                STICKY_COOKIE_NAME,
+                str(int(time.time() + sticky_seconds)),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    app.extensions['read_replica'] = REPLICA_BIND
+    print(f"Read replica enabled (sticky for {sticky_seconds}s after a write)")
+    return True
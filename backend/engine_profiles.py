@@ -0,0 +1,140 @@
+"""
+Per-backend SQLAlchemy engine profiles.
+
+DB_ENGINE_PROFILE picks one: 'auto' (default) follows the database URL,
+'sqlite' and 'postgresql' force a profile, and 'default' keeps the generic
+pre-ping/recycle pool settings. Large reads (the data exports) already use
+yield_per, which on PostgreSQL runs them through a server-side cursor.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+PROFILES = ('default', 'sqlite', 'postgresql')
+
+
+def resolve_profile(config):
+    """Name of the profile to use for this config"""
+    profile = (config.get('DB_ENGINE_PROFILE') or 'auto').lower()
+    if profile in PROFILES:
+        return profile
+    if profile != 'auto':
+        raise ValueError(f"Unknown DB_ENGINE_PROFILE {profile!r}; choose auto, {', '.join(PROFILES)}")
+    backend = make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+    if backend in ('postgresql', 'postgres'):
+        return 'postgresql'
+    if backend == 'sqlite':
+        return 'sqlite'
+    return 'default'
+
+
+def _is_memory_sqlite(config):
+    database = make_url(config['SQLALCHEMY_DATABASE_URI']).database
+    return not database or database == ':memory:'
+
+
+def _pool_options(config, pool_size, max_overflow):
+    return {
+        'pool_size': int(config.get('DB_POOL_SIZE') or pool_size),
+        'max_overflow': int(config.get('DB_MAX_OVERFLOW') or max_overflow),
+        'pool_timeout': int(config.get('DB_POOL_TIMEOUT', 30)),
+    }
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured profile"""
+    profile = resolve_profile(config)
+
+    if profile == 'sqlite':
+        if _is_memory_sqlite(config):
+            # Flask-SQLAlchemy gives in-memory databases a StaticPool, which takes no sizing
+            return {}
+        # A local file: no network to pre-ping, and connections never go stale
+        return _pool_options(config, 5, 10)
+
+    if profile == 'postgresql':
+        options = {
+            'pool_pre_ping': True,
+            'pool_recycle': int(config.get('DB_POOL_RECYCLE', 1800)),
+            **_pool_options(config, 10, 20),
+        }
+        statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT_MS', 15000))
+        if statement_timeout > 0:
+            # Bounds runaway queries server-side; exports fetch in batches, each its own statement.
+            # Maintenance commands lift it with no_statement_timeout()
+            options['connect_args'] = {'options': f"-c statement_timeout={statement_timeout}"}
+        return options
+
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': 300,
+    }
+    if config.get('DB_POOL_SIZE'):
+        options.update(_pool_options(config, 5, 10))
+    return options
+
+
+def sqlite_pragmas(config):
+    """PRAGMA name -> value applied to every new SQLite connection"""
+    pragmas = {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative means KiB rather than pages
+        'cache_size': -int(config.get('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+    }
+    if _is_memory_sqlite(config):
+        # WAL needs a file; memory databases keep their own journal
+        pragmas.pop('journal_mode')
+    return pragmas
+
+
+@contextmanager
+def no_statement_timeout(connection):
+    """
+    Lift the profile's statement_timeout on one connection for maintenance
+    work (VACUUM, schema rewrites, bulk deletes), then restore the default.
+    Works in and outside a transaction; a no-op on other databases.
+    """
+    if connection.dialect.name != 'postgresql':
+        yield connection
+        return
+    connection.execute(text('SET statement_timeout = 0'))
+    try:
+        yield connection
+    finally:
+        # Back to the connect-time value before the connection returns to the pool
+        connection.execute(text('RESET statement_timeout'))
+
+
+def install_engine_profile(engine, config):
+    """Attach the profile's connect-time setup to an engine; returns the profile name"""
+    profile = resolve_profile(config)
+    if profile == 'sqlite' and engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(config)
+
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+        event.listen(engine, 'connect', apply_pragmas)
+    return profile
+
+
+def init_engine_profile(app, db):
+    """Install the profile on the app's engines (call before anything connects)"""
+    with app.app_context():
+        profile = install_engine_profile(db.engine, app.config)
+        for key, engine in db.engines.items():
+            if key is not None:
+                # Binds (the read replica) get the same profile for their own URL
+                bind_url = engine.url.render_as_string(hide_password=False)
+                install_engine_profile(engine, {**app.config, 'SQLALCHEMY_DATABASE_URI': bind_url})
+    app.extensions['engine_profile'] = profile
+    return profile
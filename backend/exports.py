@@ -0,0 +1,102 @@
+"""
+Streaming CSV/NDJSON exports for the admin panel
+"""
+import csv
+import io
+import json
+from datetime import datetime, date
+
+from sqlalchemy import select
+
+from models import Contact, Newsletter, ChatSession, ChatMessage, db
+
+# Export name -> (model, column used for date-range filtering)
+EXPORTS = {
+    'contacts': (Contact, Contact.created_at),
+    'newsletter': (Newsletter, Newsletter.subscribed_at),
+    'chat_sessions': (ChatSession, ChatSession.created_at),
+    'chat_messages': (ChatMessage, ChatMessage.timestamp),
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 1000
+
+
+def parse_date_bound(value):
+    """Parse an ISO date/datetime query parameter; returns None when empty"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def _serialize(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    # JSON columns (chat_sessions.context_data) come back as dicts; CSV gets them as JSON text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return _serialize(value)
+
+
+def export_rows(name, since=None, until=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield (column names, row iterator) for an export.
+
+    The query runs with yield_per, which streams results from a server-side
+    cursor on PostgreSQL, so only one batch of rows is held in memory at a time.
+    """
+    model, date_column = EXPORTS[name]
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+
+    stmt = select(table).order_by(table.c.id)
+    if since is not None:
+        stmt = stmt.where(date_column >= since)
+    if until is not None:
+        stmt = stmt.where(date_column < until)
+
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    return columns, result
+
+
+def generate_csv(columns, rows, batch_size=EXPORT_BATCH_SIZE):
+    """Yield CSV text in chunks of batch_size rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_csv_value(value) for value in row])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    yield buffer.getvalue()
+
+
+def generate_ndjson(columns, rows, batch_size=EXPORT_BATCH_SIZE):
+    """Yield newline-delimited JSON in chunks of batch_size rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({column: _serialize(value) for column, value in zip(columns, row)}))
+        if len(chunk) >= batch_size:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def stream_export(name, fmt, since=None, until=None):
+    """Return a generator producing the full export body"""
+    columns, rows = export_rows(name, since, until)
+    if fmt == 'ndjson':
+        return generate_ndjson(columns, rows)
+    return generate_csv(columns, rows)
@@ -0,0 +1,115 @@
+"""
+Liveness and readiness probes with cached per-dependency checks
+"""
+import threading
+import time
+from datetime import datetime
+
+from flask import jsonify
+from sqlalchemy import text
+
+
+class DependencyCheck:
+    """
+    A named probe whose result is cached for `ttl` seconds.
+
+    Load balancers hit readiness endpoints every few seconds per instance;
+    caching keeps those probes from adding real load to the database or
+    third-party APIs. Only one thread refreshes an expired result at a time.
+    """
+
+    def __init__(self, name, probe, ttl=10.0, required=True):
+        self.name = name
+        self.probe = probe
+        self.ttl = ttl
+        self.required = required
+        self._result = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            detail = self.probe()
+            healthy = True
+        except Exception as e:
+            detail = str(e)
+            healthy = False
+        return {
+            'healthy': healthy,
+            'required': self.required,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 2),
+            'detail': detail,
+            'checked_at': datetime.utcnow().isoformat(),
+        }
+
+    def result(self):
+        now = time.monotonic()
+        if self._result is not None and now < self._expires:
+            return self._result
+        with self._lock:
+            if self._result is None or time.monotonic() >= self._expires:
+                self._result = self._run()
+                self._expires = time.monotonic() + self.ttl
+        return self._result
+
+
+def database_probe(db):
+    def probe():
+        with db.engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        return 'ok'
+    return probe
+
+
+def llm_probe():
+    """Report whether the Groq client initialised; never calls the API"""
+    from backend import routes
+    if not routes.CHATBOT_AVAILABLE:
+        raise RuntimeError('Chatbot module failed to import')
+    from backend.Chatbot import get_client
+    if get_client() is None:
+        raise RuntimeError('Groq client not initialised; using fallback responses')
+    return 'client initialised'
+
+
+def mail_probe():
+    """
+    Report the state of the mail sender if one has been built. The sender
+    authenticates with Gmail on first use (possibly interactively), so the
+    probe never builds it: until the first mail it is 'not initialised'.
+    """
+    from backend.routes import peek_email_sender
+    sender = peek_email_sender()
+    if sender is None:
+        return 'not initialised'
+    if sender.gmail_service is None:
+        raise RuntimeError('Gmail service not authenticated')
+    return 'authenticated'
+
+
+def init_health(app, db):
+    """Register /health/live and /health/ready"""
+    ttl = app.config.get('HEALTH_CHECK_TTL', 10.0)
+    required = {name.strip() for name in app.config.get('HEALTH_REQUIRED_CHECKS', ('database',))}
+    checks = [
+        DependencyCheck('database', database_probe(db), ttl, 'database' in required),
+        DependencyCheck('llm', llm_probe, ttl, 'llm' in required),
+        DependencyCheck('mail', mail_probe, ttl, 'mail' in required),
+    ]
+    app.extensions['health_checks'] = checks
+
+    def live():
+        return jsonify({'status': 'alive'}), 200
+
+    def ready():
+        results = {check.name: check.result() for check in checks}
+        is_ready = all(result['healthy'] for result in results.values() if result['required'])
+        degraded = not all(result['healthy'] for result in results.values())
+        status = 'ready' if is_ready else 'unready'
+        if is_ready and degraded:
+            status = 'degraded'
+        return jsonify({'status': status, 'checks': results}), 200 if is_ready else 503
+
+    app.add_url_rule('/health/live', 'health_live', live)
+    app.add_url_rule('/health/ready', 'health_ready', ready)
@@ -0,0 +1,194 @@
+"""
+Resized, recompressed derivatives of local images.
+
+For a source such as uploads/hero.jpeg, derivatives are written to
+static/derived/uploads/hero.jpeg/<width>w.<format> at each IMAGE_WIDTHS width
+(capped at the original's width, never upscaled), in every IMAGE_FORMATS
+format this Pillow build can encode (AVIF needs Pillow 11.2+ or the
+pillow-avif plugin, WebP is always there). Existing derivatives newer than
+their source are reused.
+
+`flask build-images` processes backend/static/uploads and local event images;
+new events are processed in the background when they are created. Templates
+render <picture> elements through macros/images.html, so browsers download
+only the width and format they need. Sources without derivatives (or remote
+URLs) fall back to a plain <img>.
+"""
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from flask import current_app, url_for
+
+DERIVED_DIRNAME = 'derived'
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tif', '.tiff'}
+MIME_TYPES = {'AVIF': 'image/avif', 'WEBP': 'image/webp'}
+SAVE_OPTIONS = {
+    'AVIF': lambda quality: {'quality': quality, 'speed': 6},
+    'WEBP': lambda quality: {'quality': quality, 'method': 4},
+}
+_STATIC_PREFIX = '/static/'
+
+
+def available_formats(requested):
+    """The requested formats (e.g. ['avif', 'webp']) Pillow can write, best first"""
+    from PIL import Image
+    Image.init()
+    return [name.upper() for name in requested if name.upper() in Image.SAVE and name.upper() in MIME_TYPES]
+
+
+def static_image_path(src):
+    """Static-relative path for a local image URL or path, or None for remote/non-image sources"""
+    if not src:
+        return None
+    parsed = urlparse(src)
+    if parsed.scheme or parsed.netloc:
+        return None
+    path = parsed.path
+    if path.startswith(_STATIC_PREFIX):
+        path = path[len(_STATIC_PREFIX):]
+    path = path.lstrip('/')
+    if not path or Path(path).suffix.lower() not in IMAGE_SUFFIXES or '..' in Path(path).parts:
+        return None
+    return path
+
+
+def derivative_widths(source_width, widths):
+    """Target widths for a source: the configured ones, capped at its own width"""
+    return sorted({min(width, source_width) for width in widths})
+
+
+def generate_derivatives(static_dir, relative_path, widths, formats, quality=75, force=False):
+    """
+    Write missing or stale derivatives of one static image.
+
+    Returns {'generated': n, 'cached': n, 'source_bytes': n, 'derived': {format: [(width, relative_path)]}}.
+    """
+    from PIL import Image, ImageOps
+
+    static_dir = Path(static_dir)
+    source = static_dir / relative_path
+    source_mtime = source.stat().st_mtime
+    target_dir = static_dir / DERIVED_DIRNAME / relative_path
+    result = {'generated': 0, 'cached': 0, 'source_bytes': source.stat().st_size, 'derived': {}}
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for width in derivative_widths(image.width, widths):
+            resized = None
+            for image_format in formats:
+                target = target_dir / f"{width}w.{image_format.lower()}"
+                result['derived'].setdefault(image_format, []).append(
+                    (width, target.relative_to(static_dir).as_posix())
+                )
+                if not force and target.exists() and target.stat().st_mtime >= source_mtime:
+                    result['cached'] += 1
+                    continue
+                if resized is None:
+                    height = max(1, round(image.height * width / image.width))
+                    resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                partial = target.with_name(f".{target.name}.tmp")
+                resized.save(partial, format=image_format, **SAVE_OPTIONS[image_format](quality))
+                os.replace(partial, target)
+                result['generated'] += 1
+    return result
+
+
+def _settings(app):
+    return (
+        app.config.get('IMAGE_WIDTHS', [64, 128, 320, 640, 960, 1280, 1920]),
+        available_formats(app.config.get('IMAGE_FORMATS', ['avif', 'webp'])),
+        app.config.get('IMAGE_QUALITY', 75),
+    )
+
+
+def _scan_derivatives(static_dir):
+    """Index what is already on disk: {source: {format: [(width, path)]}}"""
+    index = {}
+    derived_root = Path(static_dir) / DERIVED_DIRNAME
+    if not derived_root.is_dir():
+        return index
+    for derivative in derived_root.rglob('*w.*'):
+        image_format = derivative.suffix[1:].upper()
+        if image_format not in MIME_TYPES or derivative.name.startswith('.') or not derivative.is_file():
+            continue
+        try:
+            width = int(derivative.stem[:-1])
+        except ValueError:
+            continue
+        source = derivative.parent.relative_to(derived_root).as_posix()
+        index.setdefault(source, {}).setdefault(image_format, []).append(
+            (width, derivative.relative_to(static_dir).as_posix())
+        )
+    for formats in index.values():
+        for entries in formats.values():
+            entries.sort()
+    return index
+
+
+def _index(app):
+    index = app.extensions.get('image_derivatives')
+    if index is None:
+        index = app.extensions['image_derivatives'] = _scan_derivatives(app.static_folder)
+    return index
+
+
+def process_images(app, relative_paths, force=False):
+    """Generate derivatives for static-relative image paths; returns aggregate stats"""
+    widths, formats, quality = _settings(app)
+    stats = {'sources': 0, 'generated': 0, 'cached': 0, 'failed': 0, 'source_bytes': 0, 'formats': formats}
+    index = _index(app)
+    for relative_path in relative_paths:
+        try:
+            result = generate_derivatives(app.static_folder, relative_path, widths, formats, quality, force)
+        except Exception as e:
+            print(f"Could not process image {relative_path}: {e}")
+            stats['failed'] += 1
+            continue
+        index[relative_path] = result['derived']
+        stats['sources'] += 1
+        stats['generated'] += result['generated']
+        stats['cached'] += result['cached']
+        stats['source_bytes'] += result['source_bytes']
+    return stats
+
+
+def process_images_async(app, image_urls):
+    """Generate derivatives for any local images among image_urls in a background thread"""
+    paths = [path for path in map(static_image_path, image_urls)
+             if path and os.path.isfile(os.path.join(app.static_folder, path))]
+    if not paths:
+        return None
+    thread = threading.Thread(target=process_images, args=(app, paths), name='image-derivatives', daemon=True)
+    thread.start()
+    return thread
+
+
+def responsive_image(src):
+    """
+    Template helper: {'src': fallback URL, 'sources': [{'type', 'srcset'}]}
+    for macros/images.html. Remote or unprocessed images get no sources.
+    """
+    relative_path = static_image_path(src)
+    if relative_path is None:
+        return {'src': src, 'sources': []}
+    derived = _index(current_app).get(relative_path, {})
+    sources = []
+    # Best format first: browsers take the first <source> type they support
+    for image_format in MIME_TYPES:
+        entries = derived.get(image_format)
+        if entries:
+            sources.append({
+                'type': MIME_TYPES[image_format],
+                'srcset': ', '.join(f"{url_for('static', filename=path)} {width}w" for width, path in entries),
+            })
+    return {'src': url_for('static', filename=relative_path), 'sources': sources}
+
+
+def init_images(app):
+    """Expose responsive_image() to templates"""
+    app.add_template_global(responsive_image)
@@ -16,6 +16,10 @@ def init_production_database():
             db.create_all()
             print("Production database tables created successfully")
             
+            from backend.schema import upgrade_schema
+            for name in upgrade_schema(db.engine):
+                print(f"Applied schema upgrade: {name}")
+            
             # Check if we have any data
             event_count = Event.query.count()
             resource_count = Resource.query.count()
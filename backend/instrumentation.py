@@ -0,0 +1,139 @@
+"""
+App-wide request, database and background-work metrics, served at /metrics
+"""
+import threading
+import time
+
+from flask import Response, g, request
+from sqlalchemy import event
+
+from backend.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status', ['endpoint', 'method', 'status']
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by endpoint', ['endpoint', 'method']
+)
+HTTP_EXCEPTIONS = REGISTRY.counter(
+    'http_request_exceptions_total', 'Unhandled exceptions raised while handling a request', ['endpoint']
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'http_requests_in_flight', 'Requests currently being handled by this process'
+)
+
+DB_QUERIES = REGISTRY.counter('db_queries_total', 'SQL statements executed')
+DB_QUERY_LATENCY = REGISTRY.histogram('db_query_duration_seconds', 'SQL statement execution time')
+DB_POOL_CHECKOUTS = REGISTRY.counter('db_pool_checkouts_total', 'Connections checked out of the pool')
+DB_POOL = REGISTRY.gauge('db_pool_connections', 'Connection pool state by bind', ['bind', 'state'])
+
+BACKGROUND_THREADS = REGISTRY.gauge('background_threads', 'Live threads by name prefix', ['name'])
+QUEUE_DEPTH = REGISTRY.gauge('background_queue_depth', 'Items waiting in in-process work queues', ['queue'])
+
+# Thread name prefixes reported by the background_threads gauge
+THREAD_PREFIXES = ('event-announcer', 'welcome-mailer', 'newsletter-batcher',
+                   'chat-log-writer', 'session-writer', 'image-derivatives')
+
+
+def _endpoint():
+    # Unmatched URLs share one label so 404 scans cannot blow up cardinality
+    return request.endpoint or 'unmatched'
+
+
+def _before_request():
+    g._metrics_started = time.perf_counter()
+    g._metrics_in_flight = True
+    HTTP_IN_FLIGHT.inc()
+
+
+def _after_request(response):
+    started = g.pop('_metrics_started', None)
+    if started is not None:
+        endpoint = _endpoint()
+        HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+
+def _teardown_request(exc):
+    if g.pop('_metrics_in_flight', False):
+        HTTP_IN_FLIGHT.dec()
+    if exc is not None:
+        HTTP_EXCEPTIONS.inc(endpoint=_endpoint())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_metrics_query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERIES.inc()
+    started = conn.info.get('_metrics_query_started')
+    if started:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started.pop())
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    # so the connection's stack does not grow and mistime later queries
+    if context.connection is not None:
+        started = context.connection.info.get('_metrics_query_started')
+        if started:
+            started.pop()
+
+
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKOUTS.inc()
+
+
+def _count_threads(prefix):
+    return sum(1 for thread in threading.enumerate() if thread.name.startswith(prefix))
+
+
+def watch_queue(name, callback):
+    """Report callback() as the depth of the named in-process queue"""
+    QUEUE_DEPTH.set_function(callback, queue=name)
+
+
+def _pool_state(engine, state):
+    # engine.pool is looked up at scrape time: dispose() (e.g. in a forked
+    # worker) replaces the pool, and the old one would report frozen numbers
+    return getattr(engine.pool, state)()
+
+
+def instrument_engine(engine, bind='default'):
+    """Count statements, time them and track pool checkouts for an engine"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    # Pool listeners carry over to the pool dispose() creates
+    event.listen(engine.pool, 'checkout', _pool_checkout)
+
+    # Only QueuePool-style pools expose size/overflow; SQLite memory pools do not
+    for state in ('size', 'checkedout', 'overflow', 'checkedin'):
+        if callable(getattr(engine.pool, state, None)):
+            DB_POOL.set_function(lambda state=state: _pool_state(engine, state), bind=bind, state=state)
+
+
+def init_metrics(app, db):
+    """Register request hooks, engine events and the /metrics endpoint"""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+    with app.app_context():
+        # The default engine plus any binds, e.g. the read replica
+        for bind, engine in db.engines.items():
+            instrument_engine(engine, bind or 'default')
+
+    BACKGROUND_THREADS.set_function(threading.active_count, name='all')
+    for prefix in THREAD_PREFIXES:
+        BACKGROUND_THREADS.set_function(lambda prefix=prefix: _count_threads(prefix), name=prefix)
+
+    def metrics():
+        return Response(REGISTRY.render(), mimetype=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_url_rule('/metrics', 'metrics', metrics)
@@ -0,0 +1,133 @@
+"""
+Admission control for LLM calls.
+
+Each chat turn takes one of LLM_MAX_CONCURRENCY slots for its Groq call. When
+all are busy it waits up to LLM_QUEUE_TIMEOUT_MS, behind at most
+LLM_MAX_QUEUE other waiters, and is otherwise turned away: ChatBot() answers
+with the keyword fallback (LLM_OVERLOAD_MODE=fallback) or the route returns
+503 with Retry-After (reject). A rate-limit response from Groq closes
+admission for LLM_RATE_LIMIT_COOLDOWN seconds rather than retrying, so a
+throttled upstream costs each turn nothing instead of a blocked thread.
+
+Limits are per process; rate_limit.py's load shedding caps the chat
+requests a worker accepts in the first place.
+"""
+import math
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from backend.metrics import REGISTRY
+
+LLM_ADMISSIONS = REGISTRY.counter(
+    'llm_admissions_total', 'LLM call admission decisions', ['outcome']
+)
+LLM_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    'llm_queue_wait_seconds', 'Time chat turns waited for an LLM slot'
+)
+LLM_IN_FLIGHT = REGISTRY.gauge(
+    'llm_calls_in_flight', 'LLM calls currently holding a slot in this process'
+)
+
+
+class LLMOverCapacity(Exception):
+    """No LLM slot was available; the caller should retry after retry_after seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM over capacity, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Counting semaphore with a bounded, time-limited wait and an upstream cooldown"""
+
+    def __init__(self, max_concurrent=4, max_waiting=8, queue_timeout=2.0, retry_after=5, mode='fallback'):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.mode = mode
+        # max_concurrent <= 0 admits everything
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+        self._cooldown_until = 0.0
+
+    def acquire(self):
+        """Take a slot, queueing up to queue_timeout; False when over capacity"""
+        if time.monotonic() < self._cooldown_until:
+            LLM_ADMISSIONS.inc(outcome='cooldown')
+            return False
+        if self._slots is None or self._slots.acquire(blocking=False):
+            return self._admitted('admitted')
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                LLM_ADMISSIONS.inc(outcome='queue_full')
+                return False
+            self._waiting += 1
+        started = time.perf_counter()
+        try:
+            admitted = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - started)
+        if not admitted:
+            LLM_ADMISSIONS.inc(outcome='timeout')
+            return False
+        return self._admitted('queued')
+
+    def _admitted(self, outcome):
+        with self._lock:
+            self._active += 1
+        LLM_ADMISSIONS.inc(outcome=outcome)
+        return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def cool_down(self, seconds):
+        """Turn calls away for `seconds`, e.g. after the upstream rate-limited us"""
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+
+    def retry_after_seconds(self):
+        """Retry hint for a turned-away caller: the cooldown's remainder or retry_after"""
+        return max(self.retry_after, math.ceil(self._cooldown_until - time.monotonic()))
+
+    def active(self):
+        return self._active
+
+    def waiting(self):
+        return self._waiting
+
+
+def init_llm_admission(app):
+    """Create the app's LLM admission controller from LLM_* settings"""
+    controller = AdmissionController(
+        max_concurrent=app.config.get('LLM_MAX_CONCURRENCY', 4),
+        max_waiting=app.config.get('LLM_MAX_QUEUE', 2),
+        queue_timeout=app.config.get('LLM_QUEUE_TIMEOUT_MS', 2000) / 1000.0,
+        retry_after=app.config.get('LLM_RETRY_AFTER', 5),
+        mode=app.config.get('LLM_OVERLOAD_MODE', 'fallback')
+    )
+    app.extensions['llm_admission'] = controller
+    LLM_IN_FLIGHT.set_function(controller.active)
+
+    from backend.instrumentation import watch_queue
+    watch_queue('llm_admission', controller.waiting)
+    return controller
+
+
+def get_llm_admission():
+    """The app's controller; outside an app (the CLI chat loop) an unlimited one"""
+    if has_app_context() and 'llm_admission' in current_app.extensions:
+        return current_app.extensions['llm_admission']
+    return _UNLIMITED
+
+
+_UNLIMITED = AdmissionController(max_concurrent=0)
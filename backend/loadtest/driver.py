@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Asyncio load driver for a running MIC server.
+
+Runs N concurrent virtual users per scenario for a fixed duration and
+reports p50/p95/p99 latency, throughput and error counts per scenario and
+per request:
+
+    python backend/loadtest/driver.py http://127.0.0.1:5000 --users 20 --duration 30
+    python backend/loadtest/driver.py http://127.0.0.1:5000 --scenarios chat --users 50 --output chat.json
+
+Start the server with the fake Groq and Gmail services (fake_services.py)
+so chat and mail traffic never reaches the real APIs.
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+try:
+    from backend.loadtest.scenarios import SCENARIOS
+except ImportError:
+    from scenarios import SCENARIOS
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, math.ceil(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+def summarize(samples, errors, elapsed):
+    samples = sorted(samples)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': _ms(percentile(samples, 0.50)),
+        'p95_ms': _ms(percentile(samples, 0.95)),
+        'p99_ms': _ms(percentile(samples, 0.99)),
+        'max_ms': _ms(samples[-1] if samples else None),
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+class Recorder:
+    """Collects latencies and failures per request name"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def record(self, name, pending):
+        started = time.perf_counter()
+        try:
+            response = await pending
+        except httpx.HTTPError as e:
+            self.samples[name].append(time.perf_counter() - started)
+            self.errors[name] += 1
+            self.statuses[name][type(e).__name__] += 1
+            return None
+        self.samples[name].append(time.perf_counter() - started)
+        self.statuses[name][str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+
+async def virtual_user(client, scenario, user_id, deadline, recorder):
+    while time.monotonic() < deadline:
+        await scenario(client, user_id, recorder.record)
+
+
+async def run_scenario(base_url, name, users, duration, timeout):
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(client, SCENARIOS[name], user_id, deadline, recorder)
+            for user_id in range(users)
+        ))
+        elapsed = time.monotonic() - started
+
+    all_samples = [sample for samples in recorder.samples.values() for sample in samples]
+    return {
+        'users': users,
+        'duration_s': round(elapsed, 2),
+        **summarize(all_samples, sum(recorder.errors.values()), elapsed),
+        'requests_by_name': {
+            request_name: {
+                **summarize(samples, recorder.errors[request_name], elapsed),
+                'statuses': dict(recorder.statuses[request_name]),
+            }
+            for request_name, samples in sorted(recorder.samples.items())
+        },
+    }
+
+
+def print_report(name, result):
+    print(f"\n== {name}: {result['users']} users, {result['duration_s']}s ==")
+    print(f"{'request':24} {'count':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    rows = list(result['requests_by_name'].items()) + [('TOTAL', result)]
+    for request_name, stats in rows:
+        print(
+            f"{request_name:24} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8.1f} "
+            f"{_fmt(stats['p50_ms'])} {_fmt(stats['p95_ms'])} {_fmt(stats['p99_ms'])}"
+        )
+
+
+def _fmt(value):
+    return f"{value:>7.1f}ms" if value is not None else f"{'-':>9}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_url', help="Server to load, e.g. http://127.0.0.1:5000")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent virtual users per scenario")
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds per scenario")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument('--output', default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}. Choose from {', '.join(SCENARIOS)}")
+
+    results = {}
+    for name in names:
+        results[name] = asyncio.run(run_scenario(args.base_url, name, args.users, args.duration, args.timeout))
+        print_report(name, results[name])
+
+    report = {
+        'meta': {
+            'base_url': args.base_url,
+            'timestamp': datetime.utcnow().isoformat(),
+            'users': args.users,
+            'duration_s': args.duration,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nResults written to {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the Groq and Gmail APIs, for load testing without
+external calls or spend.
+
+    python backend/loadtest/fake_services.py --ttft-ms 400 --token-ms 25 --rate-limit 0.02
+
+Point the app at them with:
+
+    GROQ_BASE_URL=http://127.0.0.1:8091 GroqAPIKey=fake
+    GMAIL_API_ENDPOINT=http://127.0.0.1:8092
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "MAHE Innovation Centre runs workshops, hackathons and startup showcases every month. "
+    "Check our Events page at /events for upcoming dates, and visit our Resources page at "
+    "/resources for toolkits and guides."
+)
+
+EMAIL = (
+    "SUBJECT: Welcome to the MIC Innovation newsletter\n"
+    "BODY:\n"
+    "Hi there,\n\nThanks for subscribing! You'll hear about our events and resources first.\n\n"
+    "Best,\nMIC Innovation Centre"
+)
+
+
+class FakeSettings:
+    def __init__(self, ttft=0.3, token_delay=0.02, rate_limit=0.0, chunk_chars=16, gmail_latency=0.15, gmail_error_rate=0.0):
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.rate_limit = rate_limit
+        self.chunk_chars = chunk_chars
+        self.gmail_latency = gmail_latency
+        self.gmail_error_rate = gmail_error_rate
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    settings = FakeSettings()
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            return json.loads(body or b'{}')
+        except ValueError:
+            return {}
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeGroqHandler(_JSONHandler):
+    """OpenAI-compatible /openai/v1/chat/completions with streaming and 429s"""
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+        request = self._read_json()
+        settings = self.settings
+
+        if settings.rate_limit and random.random() < settings.rate_limit:
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}},
+                            headers={'Retry-After': '1'})
+            return
+
+        model = request.get('model', 'llama-3.3-70b-versatile')
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        # Email generation asks for SUBJECT/BODY; everything else gets a chat answer
+        prompt = json.dumps(request.get('messages', []))
+        content = EMAIL if 'SUBJECT:' in prompt else ANSWER
+
+        time.sleep(settings.ttft)
+        if not request.get('stream'):
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 100, 'completion_tokens': 60, 'total_tokens': 160},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for start in range(0, len(content), settings.chunk_chars):
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': content[start:start + settings.chunk_chars]}, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(settings.token_delay)
+        final = {
+            'id': completion_id,
+            'object': 'chat.completion.chunk',
+            'created': created,
+            'model': model,
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+        }
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+class FakeGmailHandler(_JSONHandler):
+    """Accepts users.messages.send and answers after a configurable delay"""
+
+    def do_POST(self):
+        if not self.path.split('?')[0].endswith('/messages/send'):
+            self._send_json(404, {'error': {'code': 404, 'message': 'not found'}})
+            return
+        self._read_json()
+        time.sleep(self.settings.gmail_latency)
+        if self.settings.gmail_error_rate and random.random() < self.settings.gmail_error_rate:
+            self._send_json(503, {'error': {'code': 503, 'message': 'Backend Error'}})
+            return
+        message_id = uuid.uuid4().hex[:16]
+        self._send_json(200, {'id': message_id, 'threadId': message_id, 'labelIds': ['SENT']})
+
+
+def _serve(handler, host, port, settings):
+    handler_class = type(handler.__name__, (handler,), {'settings': settings})
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name=f"fake-{handler.__name__}", daemon=True)
+    thread.start()
+    return server
+
+
+def start_fake_services(settings=None, host='127.0.0.1', groq_port=8091, gmail_port=8092):
+    """Start both stand-ins in background threads; returns (groq_server, gmail_server)"""
+    settings = settings or FakeSettings()
+    return (
+        _serve(FakeGroqHandler, host, groq_port, settings),
+        _serve(FakeGmailHandler, host, gmail_port, settings),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--groq-port', type=int, default=8091)
+    parser.add_argument('--gmail-port', type=int, default=8092)
+    parser.add_argument('--ttft-ms', type=float, default=300, help="Delay before the first token")
+    parser.add_argument('--token-ms', type=float, default=20, help="Delay between streamed chunks")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Fraction of Groq calls answered with 429")
+    parser.add_argument('--gmail-ms', type=float, default=150, help="Gmail send latency")
+    parser.add_argument('--gmail-error-rate', type=float, default=0.0, help="Fraction of Gmail sends that fail with 503")
+    args = parser.parse_args()
+
+    settings = FakeSettings(
+        ttft=args.ttft_ms / 1000,
+        token_delay=args.token_ms / 1000,
+        rate_limit=args.rate_limit,
+        gmail_latency=args.gmail_ms / 1000,
+        gmail_error_rate=args.gmail_error_rate,
+    )
+    start_fake_services(settings, args.host, args.groq_port, args.gmail_port)
+    print(f"Fake Groq on http://{args.host}:{args.groq_port}, fake Gmail on http://{args.host}:{args.gmail_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
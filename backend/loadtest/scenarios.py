@@ -0,0 +1,57 @@
+"""
+Traffic scenarios for the load-test driver.
+
+Each scenario is an async function taking (client, user_id, record) that
+performs one iteration of a virtual user's behaviour; `record` is the
+driver's timing helper and wraps every request so it gets its own latency
+series.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+BROWSE_PATHS = ['/', '/events', '/resources', '/about', '/api/events', '/api/resources']
+
+CHAT_CONVERSATIONS = [
+    ["What events are coming up?", "Tell me more about the first one", "How do I register?"],
+    ["What does MIC offer startups?", "What resources do you have for prototyping?", "Where can I find them?"],
+    ["Hi", "Who can use the innovation centre?", "How do I contact the team?"],
+]
+
+
+async def browse(client, user_id, record):
+    """A visitor paging through the public site and the JSON APIs"""
+    for path in random.sample(BROWSE_PATHS, 3):
+        await record(path, client.get(path))
+
+
+async def chat(client, user_id, record):
+    """A multi-turn conversation that keeps one session id across follow-ups"""
+    session_id = f"load-{user_id}-{uuid.uuid4().hex[:8]}"
+    for message in random.choice(CHAT_CONVERSATIONS):
+        await record('/api/chatbot', client.post('/api/chatbot', json={'message': message, 'session_id': session_id}))
+
+
+async def newsletter_spike(client, user_id, record):
+    """Unique signups, as after a campaign link goes out"""
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    await record('/api/newsletter', client.post('/api/newsletter', json={'email': email}))
+
+
+async def announce_event(client, user_id, record):
+    """Admins creating events, each of which fans out announcement emails"""
+    payload = {
+        'title': f"Load test event {uuid.uuid4().hex[:6]}",
+        'description': 'Generated by the load-test driver',
+        'date': (datetime.now() + timedelta(days=random.randint(1, 60))).isoformat(),
+        'location': 'MIC Auditorium',
+    }
+    await record('/api/events [POST]', client.post('/api/events', json=payload))
+
+
+SCENARIOS = {
+    'browse': browse,
+    'chat': chat,
+    'newsletter_spike': newsletter_spike,
+    'announce_event': announce_event,
+}
@@ -1,8 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 
+from db_routing import RoutingSession
+
 # Initialize db here (will be bound to app in app.py)
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Event(db.Model):
     __tablename__ = 'events'
@@ -109,9 +112,10 @@ class ChatSession(db.Model):
     session_id = db.Column(db.String(100), unique=True, nullable=False)
     user_ip = db.Column(db.String(50))
     user_agent = db.Column(db.String(500))
-    context_data = db.Column(db.Text)
+    # JSONB on PostgreSQL so context updates merge in place (see chat_sessions.merge_context)
+    context_data = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_activity = db.Column(db.DateTime, default=datetime.utcnow)
+    last_activity = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     messages = db.relationship('ChatMessage', backref='session', lazy=True, cascade='all, delete-orphan')
 
@@ -119,7 +123,7 @@ class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
     
     id = db.Column(db.Integer, primary_key=True)
-    session_id = db.Column(db.String(100), db.ForeignKey('chat_sessions.session_id'), nullable=False)
+    session_id = db.Column(db.String(100), db.ForeignKey('chat_sessions.session_id'), nullable=False, index=True)
     role = db.Column(db.String(20), nullable=False)
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
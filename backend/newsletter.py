@@ -0,0 +1,166 @@
+"""
+Newsletter subscription ingest: dialect-aware upserts and a micro-batching ingester
+"""
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import Newsletter, db
+
+SUBSCRIBED = 'subscribed'
+RESUBSCRIBED = 'resubscribed'
+ALREADY_SUBSCRIBED = 'already_subscribed'
+
+UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def _upsert(insert, emails):
+    """
+    Insert new emails and reactivate inactive ones in one statement.
+
+    Rows that were already active are left untouched and not returned. New
+    rows carry this batch's subscribed_at timestamp, which is how they are
+    told apart from reactivated rows (those keep their original timestamp).
+    """
+    now = datetime.utcnow()
+    stmt = insert(Newsletter).values([
+        {'email': email, 'is_active': True, 'subscribed_at': now} for email in emails
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Newsletter.email],
+        set_={'is_active': True},
+        where=Newsletter.is_active.is_(False)
+    ).returning(Newsletter.email, Newsletter.subscribed_at)
+
+    outcomes = dict.fromkeys(emails, ALREADY_SUBSCRIBED)
+    for email, subscribed_at in db.session.execute(stmt):
+        outcomes[email] = SUBSCRIBED if subscribed_at == now else RESUBSCRIBED
+    db.session.commit()
+    return outcomes
+
+
+def _select_then_insert(emails):
+    """Portable fallback for databases without INSERT ... ON CONFLICT"""
+    outcomes = {}
+    existing = {row.email: row for row in Newsletter.query.filter(Newsletter.email.in_(emails))}
+    for email in emails:
+        row = existing.get(email)
+        if row is None:
+            db.session.add(Newsletter(email=email))
+            outcomes[email] = SUBSCRIBED
+        elif row.is_active:
+            outcomes[email] = ALREADY_SUBSCRIBED
+        else:
+            row.is_active = True
+            outcomes[email] = RESUBSCRIBED
+    db.session.commit()
+    return outcomes
+
+
+def subscribe_emails(emails):
+    """
+    Subscribe a batch of emails; returns {email: outcome}.
+
+    Duplicate emails within the batch are collapsed first, since PostgreSQL
+    refuses to update the same row twice in one ON CONFLICT statement.
+    """
+    emails = list(dict.fromkeys(emails))
+    if not emails:
+        return {}
+    insert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if insert is None:
+        return _select_then_insert(emails)
+    return _upsert(insert, emails)
+
+
+class _PendingSignup:
+    def __init__(self, email):
+        self.email = email
+        self.done = threading.Event()
+        self.outcome = None
+        self.error = None
+
+
+class SubscriptionBatcher:
+    """
+    Coalesces signups that arrive within `window` seconds into one upsert.
+
+    Request threads call submit() and block until their batch is written, so
+    they can still answer with the right status. Welcome emails for the whole
+    batch are handed to `on_new` in a single call.
+    """
+
+    def __init__(self, app, window=0.005, max_batch=500, on_new=None):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self.on_new = on_new
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        # Started lazily so a preloaded app does not fork with a live thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='newsletter-batcher', daemon=True)
+                    self._thread.start()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def submit(self, email, timeout=5.0):
+        """Queue a signup and wait for its outcome"""
+        pending = _PendingSignup(email)
+        self._ensure_worker()
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Newsletter signup was not written in time')
+        if pending.error is not None:
+            raise pending.error
+        return pending.outcome
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            outcomes = {}
+            try:
+                with self.app.app_context():
+                    outcomes = subscribe_emails([pending.email for pending in batch])
+            except Exception as e:
+                print(f"Newsletter batch write failed: {e}")
+                for pending in batch:
+                    pending.error = e
+            seen = set()
+            for pending in batch:
+                # Only the first signup for an email in the batch counts as new
+                pending.outcome = ALREADY_SUBSCRIBED if pending.email in seen else outcomes.get(pending.email)
+                seen.add(pending.email)
+                pending.done.set()
+
+            welcome = [email for email, outcome in outcomes.items() if outcome != ALREADY_SUBSCRIBED]
+            if welcome and self.on_new:
+                try:
+                    self.on_new(welcome)
+                except Exception as e:
+                    print(f"Failed to enqueue welcome emails: {e}")
@@ -0,0 +1,123 @@
+"""
+Keyset pagination helpers for the admin listings
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+
+class Page:
+    """One page of keyset-paginated rows plus the cursor for the next page"""
+
+    def __init__(self, items, next_cursor, per_page, sort, order, search):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+        self.sort = sort
+        self.order = order
+        self.search = search
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(value, row_id):
+    """Encode the (sort value, id) of the last row into an opaque cursor"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, column):
+    """Decode a cursor back into (sort value, id); returns None if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def apply_search(query, columns, term):
+    """Filter query to rows where any of the given columns contains term"""
+    term = (term or '').strip()
+    if not term or not columns:
+        return query
+    pattern = f"%{term}%"
+    return query.filter(or_(*[column.ilike(pattern) for column in columns]))
+
+
+def _after_position(column, id_column, order, value, row_id):
+    """
+    Rows strictly after (value, row_id) in the paginate_keyset() order.
+
+    Comparisons with NULL are never true, so a NULL sort value (on either
+    side) needs its own branch or the rest of the listing would be skipped.
+    """
+    if order == 'asc':
+        if value is None:
+            return and_(column.is_(None), id_column > row_id)
+        return or_(column > value, and_(column == value, id_column > row_id), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), id_column < row_id), column.isnot(None))
+    return or_(column < value, and_(column == value, id_column < row_id))
+
+
+def paginate_keyset(query, model, sort_columns, sort, order='desc', after=None,
+                    per_page=50, search=None, search_columns=()):
+    """
+    Return one Page of query ordered by (sort column, id).
+
+    Instead of OFFSET, the next page starts strictly after the (sort value, id)
+    pair encoded in the `after` cursor, so every page costs the same index
+    range scan no matter how deep the admin pages in. NULL sort values
+    (e.g. a missing created_at) order as the largest value on every backend.
+
+    Args:
+        query: Base query (already filtered, unordered)
+        model: Model class, used for the id tiebreaker column
+        sort_columns: Mapping of allowed sort names to columns
+        sort: Requested sort name; unknown names fall back to the first entry
+        order: 'asc' or 'desc'
+        after: Cursor returned as Page.next_cursor by the previous page
+        per_page: Number of rows per page
+        search: Optional search term
+        search_columns: Columns the search term is matched against
+    """
+    if sort not in sort_columns:
+        sort = next(iter(sort_columns))
+    order = 'asc' if order == 'asc' else 'desc'
+    column = sort_columns[sort]
+    id_column = model.id
+
+    query = apply_search(query, search_columns, search)
+
+    position = decode_cursor(after, column)
+    if position is not None:
+        query = query.filter(_after_position(column, id_column, order, *position))
+
+    # NULLs last ascending and first descending, as PostgreSQL does by default
+    if order == 'asc':
+        query = query.order_by(column.asc().nulls_last(), id_column.asc())
+    else:
+        query = query.order_by(column.desc().nulls_first(), id_column.desc())
+
+    # Fetch one extra row to find out whether another page exists
+    rows = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+
+    return Page(rows, next_cursor, per_page, sort, order, (search or '').strip())
@@ -0,0 +1,119 @@
+"""
+On-demand sampling CPU profiler for request threads.
+
+A sampler thread periodically reads the stacks of threads that are handling
+matching requests (via sys._current_frames) and counts them as collapsed
+stacks, the input format of flamegraph.pl and speedscope. Nothing runs
+while no profile is in progress beyond one attribute check per request.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import request
+
+# Thread ident -> endpoint for requests in flight, tracked only while sampling
+_active_requests = {}
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def _track_request():
+    if _sampler is not None:
+        _active_requests[threading.get_ident()] = request.endpoint or 'unmatched'
+
+
+def _untrack_request(exc=None):
+    if _active_requests:
+        _active_requests.pop(threading.get_ident(), None)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse_stack(frame):
+    """Render a frame and its callers as root-first 'a;b;c'"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """Samples request-thread stacks for `duration` seconds, then writes collapsed stacks"""
+
+    def __init__(self, output_dir, duration=10.0, interval=0.005, endpoint=None):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.output_path = os.path.join(output_dir, f"{self.profile_id}.collapsed")
+        self.duration = duration
+        self.interval = interval
+        self.endpoint = endpoint
+        self.samples = 0
+        self.stacks = Counter()
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for ident, endpoint in list(_active_requests.items()):
+            if self.endpoint and endpoint != self.endpoint:
+                continue
+            frame = frames.get(ident)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+                self.samples += 1
+
+    def run(self):
+        global _sampler
+        deadline = time.monotonic() + self.duration
+        try:
+            while time.monotonic() < deadline:
+                self._sample()
+                time.sleep(self.interval)
+        finally:
+            _sampler = None
+            _active_requests.clear()
+            self._write()
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        temp_path = self.output_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+        # Rename last so readers never see a half-written profile
+        os.replace(temp_path, self.output_path)
+
+
+def start_profile(output_dir, duration, interval, endpoint=None):
+    """Start sampling in a background thread; returns the sampler, or None if one is already running"""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is not None:
+            return None
+        sampler = StackSampler(output_dir, duration, interval, endpoint)
+        _sampler = sampler
+    threading.Thread(target=sampler.run, name='stack-sampler', daemon=True).start()
+    return sampler
+
+
+def profile_path(output_dir, profile_id):
+    """Path of a finished profile, or None if it does not exist (yet)"""
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(output_dir, f"{profile_id}.collapsed")
+    return path if os.path.exists(path) else None
+
+
+def init_profiler(app):
+    """Install the request-tracking hooks when PROFILER_ENABLED is set"""
+    if not app.config.get('PROFILER_ENABLED', False):
+        return
+    if not app.config.get('PROFILER_TOKEN'):
+        print("PROFILER_ENABLED is set without PROFILER_TOKEN; /admin/profile stays closed")
+    app.before_request(_track_request)
+    app.teardown_request(_untrack_request)
@@ -0,0 +1,115 @@
+"""
+Request-scoped SQL query recorder with N+1 and query-budget warnings
+"""
+import random
+import time
+from collections import Counter
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+
+# Kept in the WSGI environ rather than on `g`: ChatBot() pushes nested app
+# contexts, which get a fresh `g` but still share the request
+QUERY_LOG_KEY = 'mic.query_log'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and request.environ.get(QUERY_LOG_KEY) is not None:
+        conn.info.setdefault('_profiler_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('_profiler_started')
+    if not started:
+        return
+    # Pop whether or not the log is still there, so the stack always balances
+    duration = time.perf_counter() - started.pop()
+    if has_request_context():
+        query_log = request.environ.get(QUERY_LOG_KEY)
+        if query_log is not None:
+            query_log.append((statement, duration))
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None:
+        started = context.connection.info.get('_profiler_started')
+        if started:
+            started.pop()
+
+
+def _shorten(statement, length=200):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= length else statement[:length] + '...'
+
+
+class QueryReport:
+    """Summary of the statements one request issued"""
+
+    def __init__(self, query_log, budget, repeat_threshold, slowest=3):
+        self.count = len(query_log)
+        self.total_time = sum(duration for _, duration in query_log)
+        self.slowest = sorted(query_log, key=lambda item: item[1], reverse=True)[:slowest]
+        repeats = Counter(statement for statement, _ in query_log)
+        # The same SQL text run many times with different parameters is the N+1 signature
+        self.repeated = [(statement, count) for statement, count in repeats.most_common() if count >= repeat_threshold]
+        self.over_budget = budget is not None and self.count > budget
+        self.budget = budget
+
+    @property
+    def has_warnings(self):
+        return self.over_budget or bool(self.repeated)
+
+    def format(self, label):
+        lines = [f"[query-profiler] {label}: {self.count} queries in {self.total_time * 1000:.1f}ms"]
+        if self.over_budget:
+            lines.append(f"  over budget: {self.count} > {self.budget}")
+        for statement, count in self.repeated:
+            lines.append(f"  possible N+1 ({count}x): {_shorten(statement)}")
+        for statement, duration in self.slowest:
+            lines.append(f"  slow {duration * 1000:.1f}ms: {_shorten(statement)}")
+        return '\n'.join(lines)
+
+
+def init_query_profiler(app, db):
+    """
+    Record every statement issued while handling a request.
+
+    Enabled with QUERY_PROFILER_ENABLED; QUERY_PROFILER_SAMPLE_RATE profiles
+    only a fraction of requests so it can stay on in production. Requests
+    that exceed QUERY_BUDGET or repeat a statement QUERY_REPEAT_THRESHOLD
+    times are always reported; others only when QUERY_PROFILER_VERBOSE is set.
+    """
+    if not app.config.get('QUERY_PROFILER_ENABLED', False):
+        return
+
+    sample_rate = app.config.get('QUERY_PROFILER_SAMPLE_RATE', 1.0)
+    budget = app.config.get('QUERY_BUDGET', 20)
+    repeat_threshold = app.config.get('QUERY_REPEAT_THRESHOLD', 5)
+    verbose = app.config.get('QUERY_PROFILER_VERBOSE', False)
+
+    with app.app_context():
+        # The replica bind too, so reads routed there are counted against the budget
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_query_log():
+        if sample_rate >= 1.0 or random.random() < sample_rate:
+            request.environ[QUERY_LOG_KEY] = []
+
+    @app.after_request
+    def report_queries(response):
+        query_log = request.environ.pop(QUERY_LOG_KEY, None)
+        if query_log is None:
+            return response
+        report = QueryReport(query_log, budget, repeat_threshold)
+        response.headers['X-Query-Count'] = str(report.count)
+        response.headers['X-Query-Time-Ms'] = f"{report.total_time * 1000:.1f}"
+        if verbose or report.has_warnings:
+            print(report.format(f"{request.method} {request.path}"))
+        return response
@@ -0,0 +1,301 @@
+"""
+Per-client rate limits and load shedding for the write and LLM endpoints.
+
+Each limited endpoint has quotas such as "20/minute,300/day" (RATELIMIT_*
+settings), counted per client IP and, for the chatbot, per chat session.
+Counts use a sliding window: the current fixed window's hits plus the
+previous window's, weighted by how much of it still overlaps. That takes
+two counters per key and never lets a burst at a window boundary through at
+twice the rate. Requests over quota get a 429 with Retry-After.
+
+Counters live in-process unless RATELIMIT_STORAGE_URL points at Redis. With
+several workers each process otherwise enforces the quota on its own share
+of the traffic.
+
+Separately, the chatbot sheds load: once RATELIMIT_CHAT_MAX_INFLIGHT chat
+requests are already waiting on the LLM in this process, further ones get a
+503 with Retry-After instead of tying up the remaining worker threads.
+"""
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from flask import jsonify, request
+
+from backend.metrics import REGISTRY
+
+RATE_LIMITED = REGISTRY.counter(
+    'rate_limited_requests_total', 'Requests rejected by a quota or by load shedding', ['group', 'reason']
+)
+CHAT_IN_FLIGHT = REGISTRY.gauge(
+    'chat_requests_in_flight', 'Chatbot requests being handled by this process'
+)
+
+# endpoint -> [(quota group, setting, scope)]; endpoints in one group share counters
+ROUTE_QUOTAS = {
+    'api.chatbot_response': [('chatbot', 'RATELIMIT_CHATBOT', 'ip'),
+                             ('chatbot', 'RATELIMIT_CHATBOT_SESSION', 'session')],
+    'api.submit_contact': [('contact', 'RATELIMIT_CONTACT', 'ip')],
+    'api.subscribe_newsletter': [('newsletter', 'RATELIMIT_NEWSLETTER', 'ip')],
+    'api.create_event': [('events', 'RATELIMIT_EVENTS', 'ip')],
+    'api.bulk_create_events': [('events', 'RATELIMIT_EVENTS', 'ip')],
+    'api.bulk_create_resources': [('resources', 'RATELIMIT_RESOURCES', 'ip')],
+}
+
+# Endpoints whose requests wait on the LLM and are subject to load shedding
+SHED_ENDPOINTS = {'api.chatbot_response'}
+
+_UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_QUOTA_PATTERN = re.compile(r'^(\d+)\s*/\s*(\d+)?\s*(second|minute|hour|day)s?$')
+
+
+def parse_quotas(spec):
+    """'20/minute, 300/day' or '5/10minutes' -> [(limit, window_seconds)]; '' -> []"""
+    quotas = []
+    for part in (spec or '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        match = _QUOTA_PATTERN.match(part)
+        if match is None or int(match.group(1)) < 1:
+            raise ValueError(f"Invalid rate limit {part!r}; expected e.g. '20/minute' or '5/10minutes'")
+        quotas.append((int(match.group(1)), int(match.group(2) or 1) * _UNITS[match.group(3)]))
+    return quotas
+
+
+def sliding_count(current, previous, elapsed, window):
+    """Hits in the sliding window ending `elapsed` seconds into the current fixed window"""
+    return previous * (1 - elapsed / window) + current
+
+
+def retry_after(limit, window, elapsed, current, previous):
+    """Whole seconds until one more hit fits under limit"""
+    if current + 1 <= limit:
+        # Room frees up as the previous window slides out
+        wait = window * (1 - (limit - current - 1) / previous) - elapsed if previous else 0
+    else:
+        # Not before the next window, and then only once this one has slid out far enough
+        wait = (window - elapsed) + window * (1 - (limit - 1) / current)
+    return max(1, math.ceil(wait))
+
+
+class LocalRateLimitBackend:
+    """In-process counters, least recently used keys dropped beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window, now=None):
+        """Count a hit if it fits; returns (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None or entry[0] < index - 1:
+                current, previous = 0, 0
+            elif entry[0] < index:
+                current, previous = 0, entry[1]
+            else:
+                current, previous = entry[1], entry[2]
+            allowed = sliding_count(current + 1, previous, elapsed, window) <= limit
+            if allowed:
+                current += 1
+            self._windows[key] = (index, current, previous)
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        if allowed:
+            return True, 0
+        return False, retry_after(limit, window, elapsed, current, previous)
+
+    def undo(self, key, window, now):
+        """Take back a hit counted at `now`"""
+        index = now // window
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is not None and entry[0] == index and entry[1] > 0:
+                self._windows[key] = (index, entry[1] - 1, entry[2])
+
+    def __len__(self):
+        return len(self._windows)
+
+
+class RedisRateLimitBackend:
+    """
+    Counters shared by every worker.
+
+    `client` is anything with redis-py's get/incr/decr/expire, so tests and
+    load runs can pass a local stand-in instead of a real server.
+    """
+
+    def __init__(self, client, prefix='mic:ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RATELIMIT_STORAGE_URL is set but the redis package is not installed')
+        return cls(redis.Redis.from_url(url))
+
+    def hit(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        index, elapsed = divmod(now, window)
+        index = int(index)
+        previous = int(self.client.get(f"{self.prefix}{key}:{index - 1}") or 0)
+        current_key = f"{self.prefix}{key}:{index}"
+        # Count first and take the hit back if it did not fit, so concurrent workers never overshoot
+        current = int(self.client.incr(current_key))
+        if current == 1:
+            self.client.expire(current_key, 2 * window + 1)
+        if sliding_count(current, previous, elapsed, window) <= limit:
+            return True, 0
+        self.client.decr(current_key)
+        return False, retry_after(limit, window, elapsed, current - 1, previous)
+
+    def undo(self, key, window, now):
+        self.client.decr(f"{self.prefix}{key}:{int(now // window)}")
+
+
+class LoadShedder:
+    """Caps the chat requests one process handles at once"""
+
+    def __init__(self, max_in_flight):
+        self.max_in_flight = max_in_flight
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.max_in_flight and self._active >= self.max_in_flight:
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+
+    def active(self):
+        return self._active
+
+
+def client_ip(trusted_proxies=0):
+    """
+    The client's address: with trusted_proxies hops in front of the app
+    (e.g. 1 on Render or Heroku), the address the outermost of them saw in
+    X-Forwarded-For; otherwise the socket peer. Entries further left are
+    client-supplied and never trusted.
+    """
+    if trusted_proxies:
+        forwarded = [hop.strip() for header in request.headers.getlist('X-Forwarded-For')
+                     for hop in header.split(',') if hop.strip()]
+        if len(forwarded) >= trusted_proxies:
+            return forwarded[-trusted_proxies]
+    return request.remote_addr or 'unknown'
+
+
+def _client_key(scope, trusted_proxies):
+    if scope == 'session':
+        from backend.chat_sessions import resolve_session_id
+        data = request.get_json(silent=True)
+        # A request without a usable id gets a fresh one, so only the IP quota applies to it
+        return resolve_session_id(data.get('session_id') if isinstance(data, dict) else None)
+    return client_ip(trusted_proxies)
+
+
+def limit_response(message, retry_seconds, status=429):
+    response = jsonify({'error': message, 'retry_after': retry_seconds})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_seconds)
+    return response
+
+
+class RateLimiter:
+    """Checks ROUTE_QUOTAS for each request against a counter backend"""
+
+    def __init__(self, backend, route_quotas, trusted_proxies=0):
+        self.backend = backend
+        self.route_quotas = route_quotas
+        self.trusted_proxies = trusted_proxies
+
+    def check(self, endpoint):
+        """
+        None when the request may proceed, else (quota group, retry_after_seconds).
+        A request denied by one quota is taken back from those it already passed.
+        """
+        now = time.time()
+        counted = []
+        for group, scope, quotas in self.route_quotas.get(endpoint, ()):
+            identity = _client_key(scope, self.trusted_proxies)
+            for limit, window in quotas:
+                key = f"{group}:{scope}:{identity}:{window}"
+                allowed, wait = self.backend.hit(key, limit, window, now)
+                if not allowed:
+                    for counted_key, counted_window in counted:
+                        self.backend.undo(counted_key, counted_window, now)
+                    return group, wait
+                counted.append((key, window))
+        return None
+
+
+def init_rate_limits(app):
+    """Enforce RATELIMIT_* quotas and chat load shedding before requests reach their views"""
+    if not app.config.get('RATELIMIT_ENABLED', True):
+        app.extensions['rate_limiter'] = None
+        return None
+    route_quotas = {}
+    for endpoint, rules in ROUTE_QUOTAS.items():
+        for group, setting, scope in rules:
+            quotas = parse_quotas(app.config.get(setting, ''))
+            if quotas:
+                route_quotas.setdefault(endpoint, []).append((group, scope, quotas))
+    url = app.config.get('RATELIMIT_STORAGE_URL')
+    if url:
+        backend = RedisRateLimitBackend.from_url(url)
+    else:
+        backend = LocalRateLimitBackend(app.config.get('RATELIMIT_MAX_KEYS', 100000))
+    limiter = RateLimiter(backend, route_quotas, app.config.get('RATELIMIT_TRUSTED_PROXIES', 0))
+    shedder = LoadShedder(app.config.get('RATELIMIT_CHAT_MAX_INFLIGHT', 6))
+    shed_retry_after = app.config.get('RATELIMIT_SHED_RETRY_AFTER', 5)
+    app.extensions['rate_limiter'] = limiter
+    app.extensions['load_shedder'] = shedder
+    admission = app.extensions.get('llm_admission')
+    if admission is not None and admission.max_concurrent > 0 and shedder.max_in_flight \
+            and admission.max_concurrent + admission.max_waiting > shedder.max_in_flight:
+        print(f"LLM_MAX_CONCURRENCY + LLM_MAX_QUEUE ({admission.max_concurrent + admission.max_waiting}) "
+              f"exceeds RATELIMIT_CHAT_MAX_INFLIGHT ({shedder.max_in_flight}): "
+              f"chat requests are shed before the LLM queue can fill")
+    CHAT_IN_FLIGHT.set_function(shedder.active)
+
+    @app.before_request
+    def enforce_rate_limits():
+        endpoint = request.endpoint
+        shed = endpoint in SHED_ENDPOINTS
+        # Shed before counting: a request turned away for capacity should not use up quota
+        if shed and not shedder.try_acquire():
+            RATE_LIMITED.inc(group='chatbot', reason='shed')
+            return limit_response('The assistant is busy right now. Please try again shortly.',
+                                     shed_retry_after, status=503)
+        if shed:
+            request.environ['mic.shed_slot'] = True
+        denied = limiter.check(endpoint)
+        if denied is None:
+            return None
+        group, wait = denied
+        RATE_LIMITED.inc(group=group, reason='quota')
+        return limit_response('Too many requests. Please slow down and try again later.', wait)
+
+    @app.teardown_request
+    def release_shed_slot(exc):
+        if request.environ.pop('mic.shed_slot', False):
+            shedder.release()
+
+    print(f"Rate limits on {len(route_quotas)} endpoint(s), counted {'in Redis' if url else 'in-process'}")
+    return limiter
@@ -1,5 +1,4 @@
-from flask import Blueprint, render_template, request, jsonify
-from sqlalchemy.exc import IntegrityError
+from flask import Blueprint, render_template, stream_template, request, jsonify, current_app, Response, stream_with_context
 import sys
 from pathlib import Path
 
@@ -9,7 +8,20 @@ if str(parent_dir) not in sys.path:
     sys.path.insert(0, str(parent_dir))
 
 from models import Event, Resource, Contact, Newsletter, db
-from backend.MailIntegration import ProfessionalEmailSender
+from db_routing import replica_reads
+from backend.pagination import paginate_keyset
+from backend.exports import EXPORTS, EXPORT_FORMATS, parse_date_bound, stream_export
+from backend.bulk_import import bulk_import, parse_records
+from backend.newsletter import SubscriptionBatcher, subscribe_emails, SUBSCRIBED, RESUBSCRIBED, ALREADY_SUBSCRIBED
+from backend.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from backend.instrumentation import watch_queue
+from backend.profiler import start_profile, profile_path
+from backend.chat_sessions import resolve_session_id, SESSION_COOKIE_NAME
+from backend.llm_admission import LLMOverCapacity
+from backend.rate_limit import limit_response
+from backend.images import process_images_async
+import hmac
+import os
 import threading
 from datetime import datetime
 
@@ -26,8 +38,34 @@ main_bp = Blueprint('main', __name__)
 api_bp = Blueprint('api', __name__)
 admin_bp = Blueprint('admin', __name__)
 
-# Initialize mail sender (lazy instantiate to avoid import issues)
-email_sender = ProfessionalEmailSender()
+# Mail sender is built on first use: the Google/Groq SDK imports and Gmail
+# authentication would otherwise run on every cold start
+email_sender = None
+_email_sender_lock = threading.Lock()
+
+def get_email_sender():
+    """Return the shared mail sender, authenticating with Gmail on first use"""
+    global email_sender
+    if email_sender is None:
+        with _email_sender_lock:
+            if email_sender is None:
+                from backend.MailIntegration import ProfessionalEmailSender
+                email_sender = ProfessionalEmailSender()
+    return email_sender
+
+def peek_email_sender():
+    """The mail sender if something has already built it, else None; never authenticates"""
+    return email_sender
+
+def reset_clients():
+    """Drop the Groq and Gmail clients and background workers, e.g. in a forked worker"""
+    global email_sender, _newsletter_batcher
+    email_sender = None
+    if CHATBOT_AVAILABLE:
+        from backend import Chatbot
+        Chatbot.reset_client()
+    # Threads do not survive fork; the batcher restarts lazily on the next signup
+    _newsletter_batcher = None
 
 # Main routes
 @main_bp.route('/')
@@ -55,6 +93,34 @@ def resources():
 def contact():
     return render_template('contact.html')
 
+def announce_events_async(app, event_ids):
+    """Announce new events to active newsletter subscribers (runs in a background thread)"""
+    try:
+        with app.app_context():
+            new_events = Event.query.filter(Event.id.in_(event_ids)).order_by(Event.date.asc()).all()
+            if not new_events:
+                return
+            subscribers = Newsletter.query.filter_by(is_active=True).all()
+            for new_event in new_events:
+                for subscriber in subscribers:
+                    try:
+                        get_email_sender().send_event_announcement(
+                            recipient_email=subscriber.email,
+                            event_title=new_event.title,
+                            event_date=new_event.date.isoformat() if new_event.date else None,
+                            location=new_event.location,
+                            description=new_event.description
+                        )
+                    except Exception as e:
+                        print(f"Failed to send event email to {subscriber.email}: {e}")
+    except Exception as e:
+        print(f"Event announcement worker error: {e}")
+
+def start_announcement_job(event_ids):
+    """Start one background job announcing all of the given events"""
+    app = current_app._get_current_object()
+    threading.Thread(target=announce_events_async, args=(app, list(event_ids)), name='event-announcer', daemon=True).start()
+
 # API Routes
 @api_bp.route('/events', methods=['GET'])
 def get_events():
@@ -88,30 +154,43 @@ def create_event():
     db.session.commit()
     
     # Announce event to active newsletter subscribers in background
-    def announce_event_async(new_event_id: int):
-        try:
-            new_event = Event.query.get(new_event_id)
-            if not new_event:
-                return
-            subscribers = Newsletter.query.filter_by(is_active=True).all()
-            for subscriber in subscribers:
-                try:
-                    email_sender.send_event_announcement(
-                        recipient_email=subscriber.email,
-                        event_title=new_event.title,
-                        event_date=new_event.date.isoformat() if new_event.date else None,
-                        location=new_event.location,
-                        description=new_event.description
-                    )
-                except Exception as e:
-                    print(f"Failed to send event email to {subscriber.email}: {e}")
-        except Exception as e:
-            print(f"Event announcement worker error: {e}")
-
-    threading.Thread(target=announce_event_async, args=(event.id,), daemon=True).start()
+    start_announcement_job([event.id])
+    # Resized WebP/AVIF copies of a local event image, for the events page srcset
+    process_images_async(current_app._get_current_object(), [event.image_url])
 
     return jsonify(event.to_dict()), 201
 
+def handle_bulk_import(name):
+    """Shared handler for the bulk import endpoints"""
+    try:
+        records = parse_records(request.get_data(as_text=True))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid JSON/NDJSON payload: {e}'}), 400
+    if not isinstance(records, list):
+        return jsonify({'error': 'Payload must be a JSON array or NDJSON'}), 400
+    
+    all_or_nothing = request.args.get('atomic') == '1'
+    result = bulk_import(name, records, all_or_nothing=all_or_nothing)
+    
+    if name == 'events' and result.ids and request.args.get('announce', '1') == '1':
+        start_announcement_job(result.ids)
+    if name == 'events' and result.ids:
+        process_images_async(current_app._get_current_object(),
+                             [record.get('image_url') for record in records if isinstance(record, dict)])
+    
+    status = 201 if result.inserted else 400
+    return jsonify(result.to_dict()), status
+
+@api_bp.route('/events/bulk', methods=['POST'])
+def bulk_create_events():
+    """Create many events from a JSON array or NDJSON body"""
+    return handle_bulk_import('events')
+
+@api_bp.route('/resources/bulk', methods=['POST'])
+def bulk_create_resources():
+    """Create many resources from a JSON array or NDJSON body"""
+    return handle_bulk_import('resources')
+
 @api_bp.route('/resources', methods=['GET'])
 def get_resources():
     """Get all resources"""
@@ -152,37 +231,57 @@ def submit_contact():
     
     return jsonify({'message': 'Contact form submitted successfully'}), 201
 
+def send_welcome_emails(emails):
+    """Send welcome emails for a batch of new subscribers"""
+    for email in emails:
+        try:
+            get_email_sender().send_welcome_email(email)
+        except Exception as e:
+            print(f"Failed to send welcome email to {email}: {e}")
+
+def send_welcome_emails_async(emails):
+    """Send a batch of welcome emails from one background thread"""
+    threading.Thread(target=send_welcome_emails, args=(list(emails),), name='welcome-mailer', daemon=True).start()
+
+_newsletter_batcher = None
+
+def get_newsletter_batcher():
+    """Return the per-process signup batcher, or None when batching is disabled"""
+    global _newsletter_batcher
+    window_ms = current_app.config.get('NEWSLETTER_BATCH_WINDOW_MS', 0)
+    if window_ms <= 0:
+        return None
+    if _newsletter_batcher is None:
+        _newsletter_batcher = SubscriptionBatcher(
+            current_app._get_current_object(),
+            window=window_ms / 1000.0,
+            max_batch=current_app.config.get('NEWSLETTER_BATCH_MAX_SIZE', 500),
+            on_new=send_welcome_emails_async
+        )
+    return _newsletter_batcher
+
+watch_queue('newsletter_signups', lambda: _newsletter_batcher.qsize() if _newsletter_batcher else 0)
+
 @api_bp.route('/newsletter', methods=['POST'])
 def subscribe_newsletter():
     """Subscribe to newsletter"""
     data = request.get_json()
     email = data['email']
     
-    # Check if email already exists
-    existing = Newsletter.query.filter_by(email=email).first()
-    if existing:
-        if existing.is_active:
-            return jsonify({'message': 'Already subscribed'}), 200
-        else:
-            existing.is_active = True
-            db.session.commit()
-            # Send welcome email on resubscribe (background)
-            threading.Thread(target=email_sender.send_welcome_email, args=(email,), daemon=True).start()
-            return jsonify({'message': 'Resubscribed successfully'}), 200
+    batcher = get_newsletter_batcher()
+    if batcher:
+        outcome = batcher.submit(email)
+    else:
+        outcome = subscribe_emails([email])[email]
+        if outcome != ALREADY_SUBSCRIBED:
+            # Send welcome email in background
+            send_welcome_emails_async([email])
     
-    newsletter = Newsletter(email=email)
-    db.session.add(newsletter)
-    try:
-        db.session.commit()
-    except IntegrityError:
-        db.session.rollback()
-        # Another request likely inserted concurrently; treat as idempotent success
-        return jsonify({'message': 'Already subscribed'}), 200
-    
-    # Send welcome email in background
-    threading.Thread(target=email_sender.send_welcome_email, args=(email,), daemon=True).start()
-    
-    return jsonify({'message': 'Successfully subscribed to newsletter'}), 201
+    if outcome == SUBSCRIBED:
+        return jsonify({'message': 'Successfully subscribed to newsletter'}), 201
+    if outcome == RESUBSCRIBED:
+        return jsonify({'message': 'Resubscribed successfully'}), 200
+    return jsonify({'message': 'Already subscribed'}), 200
 
 @api_bp.route('/newsletter/<email>', methods=['DELETE'])
 def unsubscribe_newsletter(email):
@@ -196,6 +295,7 @@ def unsubscribe_newsletter(email):
     return jsonify({'message': 'Email not found'}), 404
 
 @api_bp.route('/chatbot', methods=['POST'])
+@replica_reads
 def chatbot_response():
     """Handle chatbot messages with session tracking"""
     if not CHATBOT_AVAILABLE:
@@ -207,19 +307,25 @@ def chatbot_response():
     try:
         data = request.get_json()
         user_message = data.get('message', '').strip()
-        session_id = data.get('session_id')
+        # Body, then X-Session-ID header, then cookie; a new id otherwise
+        session_id = resolve_session_id(data.get('session_id'))
         
         if not user_message:
             return jsonify({'error': 'No message provided'}), 400
         
         bot_response = ChatBot(user_message, session_id)
         
-        return jsonify({
+        response = jsonify({
             'response': bot_response,
             'timestamp': datetime.now().isoformat(),
             'session_id': session_id
         })
+        response.set_cookie(SESSION_COOKIE_NAME, session_id, max_age=30 * 24 * 3600,
+                            httponly=True, samesite='Lax', secure=request.is_secure)
+        return response
         
+    except LLMOverCapacity as e:
+        return limit_response('The assistant is busy right now. Please try again shortly.', e.retry_after, status=503)
     except Exception as e:
         print(f"Chatbot error: {e}")
         return jsonify({
@@ -245,26 +351,140 @@ def admin_dashboard():
                          newsletter_count=newsletter_count,
                          recent_contacts=recent_contacts)
 
+def render_admin_listing(template, name, query, model, sort_columns, search_columns):
+    """Render one keyset-paginated, searchable admin listing"""
+    config = current_app.config
+    per_page = request.args.get('per_page', config.get('ADMIN_PAGE_SIZE', 50), type=int)
+    per_page = max(1, min(per_page, config.get('ADMIN_MAX_PAGE_SIZE', 1000)))
+    
+    page = paginate_keyset(
+        query,
+        model,
+        sort_columns,
+        sort=request.args.get('sort'),
+        order=request.args.get('order', 'desc'),
+        after=request.args.get('after'),
+        per_page=per_page,
+        search=request.args.get('q'),
+        search_columns=search_columns
+    )
+    
+    context = {name: page.items, 'page': page, 'sort_options': list(sort_columns)}
+    # Large pages are streamed so the first rows reach the browser while the rest render
+    if request.args.get('stream') == '1' or per_page >= config.get('ADMIN_STREAM_THRESHOLD', 200):
+        return stream_template(template, **context)
+    return render_template(template, **context)
+
 @admin_bp.route('/events')
 def admin_events():
     """Admin events management"""
-    events = Event.query.order_by(Event.date.desc()).all()
-    return render_template('admin/events.html', events=events)
+    return render_admin_listing(
+        'admin/events.html', 'events', Event.query, Event,
+        {'date': Event.date, 'title': Event.title, 'created_at': Event.created_at},
+        (Event.title, Event.location, Event.status)
+    )
 
 @admin_bp.route('/resources')
 def admin_resources():
     """Admin resources management"""
-    resources = Resource.query.order_by(Resource.created_at.desc()).all()
-    return render_template('admin/resources.html', resources=resources)
+    return render_admin_listing(
+        'admin/resources.html', 'resources', Resource.query, Resource,
+        {'created_at': Resource.created_at, 'title': Resource.title, 'download_count': Resource.download_count},
+        (Resource.title, Resource.category)
+    )
 
 @admin_bp.route('/contacts')
 def admin_contacts():
     """Admin contacts management"""
-    contacts = Contact.query.order_by(Contact.created_at.desc()).all()
-    return render_template('admin/contacts.html', contacts=contacts)
+    return render_admin_listing(
+        'admin/contacts.html', 'contacts', Contact.query, Contact,
+        {'created_at': Contact.created_at, 'name': Contact.name, 'email': Contact.email},
+        (Contact.name, Contact.email, Contact.subject, Contact.company)
+    )
 
 @admin_bp.route('/newsletter')
 def admin_newsletter():
     """Admin newsletter management"""
-    subscribers = Newsletter.query.filter_by(is_active=True).order_by(Newsletter.subscribed_at.desc()).all()
-    return render_template('admin/newsletter.html', subscribers=subscribers)
+    return render_admin_listing(
+        'admin/newsletter.html', 'subscribers', Newsletter.query.filter_by(is_active=True), Newsletter,
+        {'subscribed_at': Newsletter.subscribed_at, 'email': Newsletter.email},
+        (Newsletter.email,)
+    )
+
+@admin_bp.route('/export/<name>')
+def admin_export(name):
+    """Stream a CSV or NDJSON export, optionally limited to a date range"""
+    if name not in EXPORTS:
+        return jsonify({'error': f'Unknown export: {name}'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}'}), 400
+    
+    try:
+        since = parse_date_bound(request.args.get('since'))
+        until = parse_date_bound(request.args.get('until'))
+    except ValueError:
+        return jsonify({'error': 'since/until must be ISO 8601 dates'}), 400
+    
+    filename = f"{name}-{datetime.now().strftime('%Y%m%d%H%M%S')}.{fmt}"
+    return Response(
+        stream_with_context(stream_export(name, fmt, since, until)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@admin_bp.route('/metrics')
+def admin_metrics():
+    """Chatbot latency metrics in Prometheus text format"""
+    return Response(REGISTRY.render(prefix='chatbot_'), mimetype=PROMETHEUS_CONTENT_TYPE)
+
+def profiler_guard():
+    """Return an error response unless profiling is enabled and the token matches"""
+    config = current_app.config
+    token = config.get('PROFILER_TOKEN')
+    # No token configured means nobody is allowed in, not everybody
+    if not config.get('PROFILER_ENABLED', False) or not token:
+        return jsonify({'error': 'Not found'}), 404
+    supplied = request.headers.get('X-Profiler-Token', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({'error': 'Invalid profiler token'}), 403
+    return None
+
+def profiler_output_dir():
+    return current_app.config.get('PROFILER_OUTPUT_DIR') or os.path.join(current_app.instance_path, 'profiles')
+
+@admin_bp.route('/profile', methods=['POST'])
+def admin_start_profile():
+    """Start sampling request stacks for N seconds (optionally for one endpoint)"""
+    denied = profiler_guard()
+    if denied:
+        return denied
+    
+    seconds = max(1.0, min(request.args.get('seconds', 10.0, type=float), 120.0))
+    interval = max(1.0, request.args.get('interval_ms', 5.0, type=float)) / 1000.0
+    endpoint = request.args.get('endpoint')
+    
+    sampler = start_profile(profiler_output_dir(), seconds, interval, endpoint)
+    if sampler is None:
+        return jsonify({'error': 'A profile is already running in this worker'}), 409
+    
+    return jsonify({
+        'profile_id': sampler.profile_id,
+        'seconds': seconds,
+        'endpoint': endpoint,
+        'result_url': f"/admin/profile/{sampler.profile_id}"
+    }), 202
+
+@admin_bp.route('/profile/<profile_id>')
+def admin_get_profile(profile_id):
+    """Return a finished profile as collapsed stacks (flamegraph.pl / speedscope input)"""
+    denied = profiler_guard()
+    if denied:
+        return denied
+    
+    path = profile_path(profiler_output_dir(), profile_id)
+    if not path:
+        return jsonify({'status': 'pending or unknown profile'}), 404
+    with open(path, encoding='utf-8') as collapsed:
+        return Response(collapsed.read(), mimetype='text/plain')
@@ -2,7 +2,8 @@
 """
 Development server runner
 """
-from app import app
+from app import app, create_tables
 
 if __name__ == '__main__':
+    create_tables(app)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,68 @@
+"""
+Idempotent upgrades for existing databases, run by `flask init-db`.
+
+db.create_all() only creates missing tables; column and index changes to
+tables that already exist are applied here. Each upgrade inspects the live schema and
+does nothing when it is already current.
+"""
+from sqlalchemy import inspect, text
+
+from backend.engine_profiles import no_statement_timeout
+
+
+def upgrade_chat_context_column(connection):
+    """Convert chat_sessions.context_data from TEXT to JSONB on PostgreSQL"""
+    if connection.dialect.name != 'postgresql':
+        # SQLite stores JSON as text, so existing rows already read back as JSON
+        return False
+    inspector = inspect(connection)
+    if 'chat_sessions' not in inspector.get_table_names():
+        return False
+    columns = {column['name']: column for column in inspector.get_columns('chat_sessions')}
+    column = columns.get('context_data')
+    if column is None or column['type'].__class__.__name__ == 'JSONB':
+        return False
+    connection.execute(text(
+        "ALTER TABLE chat_sessions ALTER COLUMN context_data TYPE JSONB "
+        "USING NULLIF(context_data, '')::jsonb"
+    ))
+    return True
+
+
+# (table, column) pairs the models index; the names match what create_all() generates
+CHAT_INDEXES = [
+    ('chat_sessions', 'last_activity'),
+    ('chat_messages', 'session_id'),
+]
+
+
+def upgrade_chat_indexes(connection):
+    """Add the retention-scan and per-session indexes to tables created before the models had them"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    created = False
+    for table, column in CHAT_INDEXES:
+        if table not in tables:
+            continue
+        if any(index['column_names'][:1] == [column] for index in inspector.get_indexes(table)):
+            continue
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"))
+        created = True
+    return created
+
+
+UPGRADES = [
+    upgrade_chat_context_column,
+    upgrade_chat_indexes,
+]
+
+
+def upgrade_schema(engine):
+    """Apply pending upgrades; returns the names of the ones that changed something"""
+    applied = []
+    for upgrade in UPGRADES:
+        # Rewriting a large table can take far longer than DB_STATEMENT_TIMEOUT_MS
+        with engine.begin() as connection, no_statement_timeout(connection):
+            if upgrade(connection):
+                applied.append(upgrade.__name__)
+    return applied
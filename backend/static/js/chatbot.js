@@ -339,11 +339,12 @@
                     })
                 });
 
-                if (!response.ok) {
+                // Rate-limited and busy responses (429/503) still carry a message to show
+                const data = await response.json().catch(() => ({}));
+
+                if (!response.ok && !data.error) {
                     throw new Error('Network response was not ok');
                 }
-
-                const data = await response.json();
                 
                 if (data.error) {
                     addBotMessage(data.error, 800);
@@ -12,6 +12,11 @@ pip install -r requirements.txt
 echo "Installing Python dependencies..."
 pip install -r requirements.txt
 
+# Resized image derivatives, then fingerprint, minify and precompress static files
+echo "Building static assets..."
+flask --app app build-images
+flask --app app build-assets
+
 # Initialize database
 echo "Initializing production database..."
 python init_production_db.py
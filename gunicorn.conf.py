@@ -0,0 +1,74 @@
+"""
+Gunicorn configuration, driven by environment variables.
+
+Chat requests spend most of their time waiting on Groq, so the default is
+the threaded worker: each process serves GUNICORN_THREADS requests at once
+while sharing one copy of the app. See "Server Tuning" in README.md for
+capacity numbers per setting.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# gthread (default) or gevent; sync is kept for debugging only
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = _env_int('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 4))
+threads = _env_int('GUNICORN_THREADS', 8)
+# gevent only: greenlets per worker
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 200)
+
+# Each chat turn holds up to two sessions (ChatBot nests app contexts), so give
+# every thread room for both before requests start queueing on the pool
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(threads))
+# Lets the app see it is one of several processes (e.g. to stop caching chat sessions locally)
+os.environ.setdefault('WEB_CONCURRENCY', str(workers))
+
+# A chat turn can take 30s+ with Groq retries. For gthread/gevent this is the
+# worker heartbeat timeout; for sync workers it also caps each request.
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers to bound slow memory growth; jitter keeps them from restarting together
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Import the app once in the master so workers share its memory copy-on-write
+preload_app = _env_bool('GUNICORN_PRELOAD', False)
+
+# Heartbeat files on tmpfs avoid stalls on slow container disks
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    print(f"Starting gunicorn: {workers} x {worker_class} worker(s), {threads} thread(s) each, "
+          f"timeout {timeout}s, preload {preload_app}")
+
+
+def post_fork(server, worker):
+    """Reset connections and clients inherited from the master when the app was preloaded"""
+    if not preload_app:
+        return
+    from app import init_worker
+    init_worker(worker.app.wsgi())
+    print(f"Worker {worker.pid}: database pool and API clients reset after fork")
+
+
+def worker_abort(worker):
+    print(f"Worker {worker.pid} aborted after exceeding the {timeout}s timeout")